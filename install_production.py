@@ -167,7 +167,7 @@ def test_installation():
         import google.generativeai
         import supabase
         import pandas
-        import PyPDF2
+        import pypdf
         import gunicorn
         
         logger.info("✅ Todas as dependências importadas com sucesso")
@@ -38,7 +38,7 @@ def check_dependencies():
         import google.generativeai
         import supabase
         import pandas
-        import PyPDF2
+        import pypdf
         logger.info("✅ Todas as dependências principais encontradas")
         return True
     except ImportError as e:
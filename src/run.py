@@ -6,16 +6,19 @@ Análise Ultra-Detalhada de Mercado com IA Avançada
 """
 
 import os
+import io
 import sys
 import logging
 import locale
 from datetime import datetime
-from flask import Flask, request, jsonify, render_template, send_file
+from flask import Flask, request, jsonify, render_template, send_file, g
 from flask_cors import CORS
 from dotenv import load_dotenv
 import traceback
 import signal
 import atexit
+import time
+from collections import Counter
 
 # Carrega variáveis de ambiente
 load_dotenv(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '.env'))
@@ -33,19 +36,66 @@ except locale.Error:
 log_level = getattr(logging, os.getenv('LOG_LEVEL', 'INFO').upper())
 log_format = os.getenv('LOG_FORMAT', '%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
+class BufferedAppendFileHandler(logging.FileHandler):
+    """FileHandler em modo append que acumula registros inteiros (até 8KB) e os grava com uma
+    única escrita: com O_APPEND, linhas de workers diferentes não se intercalam no arquivo"""
+    
+    BUFFER_SIZE = 8192
+    # Idade máxima (s) de um registro retido no buffer, verificada a cada novo registro
+    FLUSH_INTERVAL = 1.0
+    
+    def __init__(self, *args, **kwargs):
+        self._pending = bytearray()
+        self._pending_since = 0.0
+        super().__init__(*args, **kwargs)
+    
+    def _open(self):
+        fd = os.open(self.baseFilename, os.O_WRONLY | os.O_APPEND | os.O_CREAT | os.O_CLOEXEC, 0o644)
+        # Sem buffer próprio: cada write é uma escrita no arquivo, feita só em flush
+        return io.FileIO(fd, 'a')
+    
+    def emit(self, record):
+        try:
+            if self.stream is None:
+                self.stream = self._open()
+            data = (self.format(record) + self.terminator).encode(self.encoding or 'utf-8')
+            # Descarrega antes de o buffer passar do limite, sempre em fronteira de registro
+            if self._pending and len(self._pending) + len(data) > self.BUFFER_SIZE:
+                self.flush()
+            if not self._pending:
+                self._pending_since = time.monotonic()
+            self._pending += data
+            if (record.levelno >= logging.ERROR
+                    or len(self._pending) >= self.BUFFER_SIZE
+                    or time.monotonic() - self._pending_since >= self.FLUSH_INTERVAL):
+                self.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+    
+    def flush(self):
+        self.acquire()
+        try:
+            if self._pending and self.stream is not None:
+                self.stream.write(self._pending)
+                self._pending.clear()
+        finally:
+            self.release()
+
+# Cria diretório de logs se necessário
+if os.getenv('LOG_FILE_ENABLED', 'true').lower() == 'true':
+    os.makedirs('logs', exist_ok=True)
+
 logging.basicConfig(
     level=log_level,
     format=log_format,
     handlers=[
         logging.StreamHandler(sys.stdout),
-        logging.FileHandler('logs/arqv30.log', encoding='utf-8') if os.getenv('LOG_FILE_ENABLED', 'true').lower() == 'true' else logging.NullHandler()
+        BufferedAppendFileHandler('logs/arqv30.log', encoding='utf-8') if os.getenv('LOG_FILE_ENABLED', 'true').lower() == 'true' else logging.NullHandler()
     ]
 )
 
-# Cria diretório de logs se necessário
-if os.getenv('LOG_FILE_ENABLED', 'true').lower() == 'true':
-    os.makedirs('logs', exist_ok=True)
-
 logger = logging.getLogger(__name__)
 
 # Importa blueprints e serviços
@@ -95,6 +145,37 @@ def create_app():
             response.headers['Referrer-Policy'] = 'strict-origin-when-cross-origin'
             return response
     
+    # Profiling por endpoint (desligado por padrão, custo zero quando inativo)
+    if os.getenv('PROFILING_ENABLED', 'false').lower() == 'true':
+        route_time_ms = Counter()
+        route_hits = Counter()
+        
+        @app.before_request
+        def start_request_timer():
+            g._t0 = time.perf_counter_ns()
+        
+        @app.after_request
+        def log_request_time(response):
+            t0 = getattr(g, '_t0', None)
+            if t0 is not None:
+                elapsed_ms = (time.perf_counter_ns() - t0) / 1e6
+                route_time_ms[request.path] += elapsed_ms
+                route_hits[request.path] += 1
+                logger.info(f"PROF {request.method} {request.path} total={elapsed_ms:.1f}ms status={response.status_code}")
+            return response
+        
+        @app.route('/api/_profile')
+        def profile_stats():
+            """Retorna tempos acumulados por endpoint"""
+            return jsonify({
+                path: {
+                    'hits': route_hits[path],
+                    'total_ms': round(total, 1),
+                    'avg_ms': round(total / route_hits[path], 1)
+                }
+                for path, total in route_time_ms.most_common()
+            })
+    
     # Compressão GZIP
     if os.getenv('GZIP_ENABLED', 'true').lower() == 'true':
         from flask_compress import Compress
@@ -11,15 +11,21 @@ import time
 import json
 from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
-import google.generativeai as genai
-import openai
-import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeoutError
 
 logger = logging.getLogger(__name__)
 
 class AIManager:
     """Gerenciador de IAs com sistema de fallback automático"""
     
+    # Modelos HuggingFace disparados em paralelo por chamada e tempo máximo de espera
+    HF_PARALLEL_MODELS = 2
+    HF_RACE_TIMEOUT = 30
+    # Chamadas simultâneas atendidas sem fila no pool (threads do servidor e análises paralelas
+    # compartilham a instância; requisições na fila consumiriam o prazo antes de começar)
+    HF_CONCURRENT_CALLERS = 4
+    
     def __init__(self):
         """Inicializa o gerenciador de IAs"""
         self.providers = {
@@ -56,6 +62,20 @@ class AIManager:
             }
         }
         
+        # Despacho pré-computado (nome, método) na ordem de fallback
+        self._dispatch = (
+            ('gemini', self._generate_with_gemini),
+            ('openai', self._generate_with_openai),
+            ('huggingface', self._generate_with_huggingface)
+        )
+        self._generators = dict(self._dispatch)
+        
+        # SDKs importados sob demanda em initialize_providers
+        self._genai = None
+        self._openai = None
+        self._hf_session = None
+        self._hf_executor = None
+        
         self.initialize_providers()
         logger.info(f"AI Manager inicializado com {len([p for p in self.providers.values() if p['available']])} provedores disponíveis")
     
@@ -66,6 +86,8 @@ class AIManager:
         try:
             gemini_key = os.getenv('GEMINI_API_KEY')
             if gemini_key:
+                import google.generativeai as genai
+                self._genai = genai
                 genai.configure(api_key=gemini_key)
                 self.providers['gemini']['client'] = genai.GenerativeModel("gemini-1.5-flash")
                 self.providers['gemini']['available'] = True
@@ -77,7 +99,8 @@ class AIManager:
         try:
             openai_key = os.getenv('OPENAI_API_KEY')
             if openai_key:
-                openai.api_key = openai_key
+                import openai
+                self._openai = openai
                 self.providers["openai"]["client"] = openai.OpenAI(api_key=openai_key)
                 self.providers["openai"]["available"] = True
                 logger.info("✅ OpenAI inicializado com sucesso")
@@ -88,9 +111,29 @@ class AIManager:
         try:
             hf_key = os.getenv('HUGGINGFACE_API_KEY')
             if hf_key:
+                import requests
+                self._hf_session = requests.Session()
+                self._hf_executor = ThreadPoolExecutor(
+                    max_workers=self.HF_PARALLEL_MODELS * self.HF_CONCURRENT_CALLERS,
+                    thread_name_prefix='hf-race'
+                )
                 self.providers['huggingface']['client'] = {
                     'api_key': hf_key,
-                    'base_url': 'https://api-inference.huggingface.co/models/'
+                    'base_url': 'https://api-inference.huggingface.co/models/',
+                    'headers': {
+                        "Authorization": f"Bearer {hf_key}",
+                        "Content-Type": "application/json"
+                    },
+                    'parameters': {
+                        "temperature": 0.9,
+                        "return_full_text": False,
+                        "do_sample": True,
+                        "top_p": 0.95
+                    },
+                    'options': {
+                        "wait_for_model": True,
+                        "use_cache": False
+                    }
                 }
                 self.providers['huggingface']['available'] = True
                 logger.info("✅ HuggingFace inicializado com sucesso")
@@ -114,8 +157,13 @@ class AIManager:
             ]
         
         if available_providers:
-            # Ordena por prioridade e menor número de erros
-            available_providers.sort(key=lambda x: (x[1]['priority'], x[1]['error_count']))
+            # Provedores em rate limit vão para o fim da fila; depois prioridade e menor número de erros
+            now = time.monotonic()
+            available_providers.sort(key=lambda x: (
+                (x[1]['rate_limit_reset'] or 0) > now,
+                x[1]['priority'],
+                x[1]['error_count']
+            ))
             return available_providers[0][0]
         
         return None
@@ -131,20 +179,13 @@ class AIManager:
         logger.info(f"🤖 Usando provedor: {provider_name}")
         
         try:
-            if provider_name == 'gemini':
-                return self._generate_with_gemini(prompt, max_tokens)
-            elif provider_name == 'openai':
-                return self._generate_with_openai(prompt, max_tokens)
-            elif provider_name == 'huggingface':
-                return self._generate_with_huggingface(prompt, max_tokens)
+            return self._generators[provider_name](prompt, max_tokens)
         except Exception as e:
             logger.error(f"❌ Erro no provedor {provider_name}: {str(e)}")
             self.providers[provider_name]['error_count'] += 1
             
             # Tenta próximo provedor
             return self._try_fallback(prompt, max_tokens, exclude=[provider_name])
-        
-        return None
     
     def _generate_with_gemini(self, prompt: str, max_tokens: int) -> Optional[str]:
         """Gera conteúdo usando Gemini"""
@@ -181,7 +222,7 @@ class AIManager:
         except Exception as e:
             if "quota" in str(e).lower() or "limit" in str(e).lower():
                 logger.warning(f"⚠️ Gemini atingiu limite de quota: {str(e)}")
-                self.providers['gemini']['rate_limit_reset'] = time.time() + 3600  # 1 hora
+                self.providers['gemini']['rate_limit_reset'] = time.monotonic() + 3600  # 1 hora
             raise e
     
     def _generate_with_openai(self, prompt: str, max_tokens: int) -> Optional[str]:
@@ -190,7 +231,7 @@ class AIManager:
             openai_key = os.getenv("OPENAI_API_KEY")
             if not openai_key:
                 raise ValueError("OPENAI_API_KEY not found")
-            client = openai.OpenAI(api_key=openai_key)
+            client = self._openai.OpenAI(api_key=openai_key)
             response = client.chat.completions.create(
                 model="gpt-3.5-turbo",
                 messages=[
@@ -212,83 +253,91 @@ class AIManager:
         except Exception as e:
             if "quota" in str(e).lower() or "limit" in str(e).lower():
                 logger.warning(f"⚠️ OpenAI atingiu limite de quota: {str(e)}")
-                self.providers['openai']['rate_limit_reset'] = time.time() + 3600
+                self.providers['openai']['rate_limit_reset'] = time.monotonic() + 3600
             raise e
     
     def _generate_with_huggingface(self, prompt: str, max_tokens: int) -> Optional[str]:
-        """Gera conteúdo usando HuggingFace com rotação de modelos"""
+        """Gera conteúdo usando HuggingFace disparando os próximos modelos em paralelo"""
         hf_config = self.providers['huggingface']
+        hf_client = hf_config['client']
         models = hf_config['models']
         
-        # Tenta todos os modelos disponíveis
-        for attempt in range(len(models)):
-            current_model = models[hf_config['current_model_index']]
-            
-            try:
-                url = f"{hf_config['client']['base_url']}{current_model}"
-                headers = {
-                    "Authorization": f"Bearer {hf_config['client']['api_key']}",
-                    "Content-Type": "application/json"
-                }
-                
-                payload = {
-                    "inputs": prompt,
-                    "parameters": {
-                        "max_new_tokens": max_tokens,
-                        "temperature": 0.9,
-                        "return_full_text": False,
-                        "do_sample": True,
-                        "top_p": 0.95
-                    },
-                    "options": {
-                        "wait_for_model": True,
-                        "use_cache": False
-                    }
-                }
-                
-                response = requests.post(url, headers=headers, json=payload, timeout=60)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    
-                    if isinstance(data, list) and len(data) > 0:
-                        if "generated_text" in data[0]:
-                            content = data[0]["generated_text"]
-                        elif "text" in data[0]:
-                            content = data[0]["text"]
-                        else:
-                            content = str(data[0])
-                        
-                        # Remove prompt se incluído
-                        if content.startswith(prompt):
-                            content = content[len(prompt):].strip()
-                        
-                        if content:
-                            logger.info(f"✅ HuggingFace ({current_model}) gerou {len(content)} caracteres")
-                            return content
-                
-                elif response.status_code == 503:
-                    logger.warning(f"⚠️ Modelo {current_model} carregando, tentando próximo...")
-                    # Rotaciona para próximo modelo
-                    hf_config['current_model_index'] = (hf_config['current_model_index'] + 1) % len(models)
-                    continue
-                else:
-                    logger.warning(f"⚠️ Erro {response.status_code} no modelo {current_model}")
-                    hf_config['current_model_index'] = (hf_config['current_model_index'] + 1) % len(models)
+        # Payload e headers não mudam entre tentativas; monta uma única vez
+        headers = hf_client['headers']
+        payload = json.dumps({
+            "inputs": prompt,
+            "parameters": {**hf_client['parameters'], "max_new_tokens": max_tokens},
+            "options": hf_client['options']
+        })
+        
+        # Corrida entre os próximos K modelos da rotação; vence a primeira resposta válida
+        start_index = hf_config['current_model_index']
+        race_size = min(self.HF_PARALLEL_MODELS, len(models))
+        candidates = [(start_index + offset) % len(models) for offset in range(race_size)]
+        
+        futures = {
+            self._hf_executor.submit(
+                self._request_huggingface_model, models[index], headers, payload, prompt
+            ): index
+            for index in candidates
+        }
+        
+        try:
+            for future in as_completed(futures, timeout=self.HF_RACE_TIMEOUT):
+                index = futures[future]
+                try:
+                    content = future.result()
+                except Exception as e:
+                    logger.warning(f"⚠️ Erro no modelo {models[index]}: {str(e)}")
                     continue
-                    
-            except Exception as e:
-                logger.warning(f"⚠️ Erro no modelo {current_model}: {str(e)}")
-                hf_config['current_model_index'] = (hf_config['current_model_index'] + 1) % len(models)
-                continue
+                
+                if content:
+                    hf_config['current_model_index'] = index
+                    logger.info(f"✅ HuggingFace ({models[index]}) gerou {len(content)} caracteres")
+                    return content
+        except FuturesTimeoutError:
+            logger.warning(f"⚠️ Modelos HuggingFace não responderam em {self.HF_RACE_TIMEOUT}s")
+        finally:
+            # Descarta as requisições que ainda não começaram (as já em andamento terminam sozinhas)
+            for future in futures:
+                future.cancel()
         
+        # Nenhum candidato respondeu; a próxima chamada começa pelos modelos seguintes
+        hf_config['current_model_index'] = (start_index + race_size) % len(models)
         raise Exception("Todos os modelos HuggingFace falharam")
     
+    def _request_huggingface_model(self, model: str, headers: Dict[str, str], payload: str, prompt: str) -> Optional[str]:
+        """Executa uma requisição a um modelo HuggingFace e extrai o texto gerado"""
+        url = f"{self.providers['huggingface']['client']['base_url']}{model}"
+        response = self._hf_session.post(url, headers=headers, data=payload, timeout=self.HF_RACE_TIMEOUT)
+        
+        if response.status_code == 503:
+            raise Exception(f"Modelo {model} carregando")
+        if response.status_code != 200:
+            raise Exception(f"Erro {response.status_code} no modelo {model}")
+        
+        data = response.json()
+        if not isinstance(data, list) or len(data) == 0:
+            return None
+        
+        if "generated_text" in data[0]:
+            content = data[0]["generated_text"]
+        elif "text" in data[0]:
+            content = data[0]["text"]
+        else:
+            content = str(data[0])
+        
+        # Remove prompt se incluído
+        if content.startswith(prompt):
+            content = content[len(prompt):].strip()
+        
+        return content
+    
     def _try_fallback(self, prompt: str, max_tokens: int, exclude: List[str] = None) -> Optional[str]:
         """Tenta usar provedor de fallback"""
         exclude = exclude or []
         
-        for provider_name in ['gemini', 'openai', 'huggingface']:
+        for provider_name, generate in self._dispatch:
             if provider_name in exclude:
                 continue
                 
@@ -301,12 +350,7 @@ class AIManager:
             logger.info(f"🔄 Tentando fallback para: {provider_name}")
             
             try:
-                if provider_name == 'gemini':
-                    return self._generate_with_gemini(prompt, max_tokens)
-                elif provider_name == 'openai':
-                    return self._generate_with_openai(prompt, max_tokens)
-                elif provider_name == 'huggingface':
-                    return self._generate_with_huggingface(prompt, max_tokens)
+                return generate(prompt, max_tokens)
             except Exception as e:
                 logger.warning(f"⚠️ Fallback {provider_name} falhou: {str(e)}")
                 self.providers[provider_name]['error_count'] += 1
@@ -318,13 +362,14 @@ class AIManager:
     def get_provider_status(self) -> Dict[str, Any]:
         """Retorna status de todos os provedores"""
         status = {}
+        now = time.monotonic()
         
         for name, provider in self.providers.items():
             status[name] = {
                 'available': provider['available'],
                 'priority': provider['priority'],
                 'error_count': provider['error_count'],
-                'rate_limited': (provider.get('rate_limit_reset') or 0) > time.time()
+                'rate_limited': (provider.get('rate_limit_reset') or 0) > now
             }
             
             if name == 'huggingface' and provider['available']:
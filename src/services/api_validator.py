@@ -6,14 +6,23 @@ Validador de chaves de API no startup
 """
 
 import os
+import time
+import asyncio
+import hashlib
 import logging
 import requests
+from requests.adapters import HTTPAdapter
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait
 from typing import Dict, Any, List
 import google.generativeai as genai
-from services.groq_client import groq_client
+from services.groq_client import get_groq_client
 
 logger = logging.getLogger(__name__)
 
+# Modelos Gemini já configurados, por hash da chave de API
+_gemini_model_cache: Dict[str, Any] = {}
+
 class APIValidator:
     """Validador de chaves de API"""
     
@@ -21,12 +30,103 @@ class APIValidator:
         self.validation_results = {}
         self.critical_apis = ['GEMINI_API_KEY']  # APIs críticas
         self.optional_apis = ['GROQ_API_KEY', 'GOOGLE_SEARCH_KEY', 'HUGGINGFACE_API_KEY']
+        self.validators = {
+            'GEMINI_API_KEY': self.validate_gemini,
+            'GROQ_API_KEY': self.validate_groq,
+            'GOOGLE_SEARCH_KEY': self.validate_google_search,
+            'HUGGINGFACE_API_KEY': self.validate_huggingface
+        }
+        
+        # Snapshot das variáveis de ambiente usadas pelos validadores
+        self._env = {}
+        self.refresh_env()
+        
+        # Tempo máximo (s) para a rodada de validação
+        self.validation_timeout = 5
+        # Timeout (conexão, leitura) de cada chamada HTTP, bem abaixo do tempo total da rodada
+        self.http_timeout = (2, 3)
+        
+        # Cache de validações bem-sucedidas: hash(api, chave) -> (instante, resultado)
+        self.cache_ttl = 600
+        self._cache = {}
+        
+        # Sessão HTTP compartilhada: mantém conexões keep-alive entre validações. Sem novas
+        # tentativas: uma repetição após falha ou lentidão não caberia no tempo da rodada
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=8))
+    
+    def refresh_env(self):
+        """Relê do ambiente as chaves usadas pelos validadores"""
+        env_names = self.critical_apis + self.optional_apis + ['GOOGLE_CSE_ID']
+        self._env = {name: os.environ.get(name) for name in env_names}
     
     def validate_all_apis(self) -> Dict[str, Any]:
         """Valida todas as APIs configuradas"""
         
         logger.info("🔍 Iniciando validação de APIs...")
         
+        # Dispara todos os validadores em paralelo: o tempo total passa a ser o da API mais lenta
+        api_results = {}
+        all_apis = self.critical_apis + self.optional_apis
+        
+        executor = ThreadPoolExecutor(max_workers=len(all_apis))
+        futures = {
+            executor.submit(self._run_validator, api_name): api_name
+            for api_name in all_apis
+            if api_name in self.validators
+        }
+        
+        # Orçamento total de tempo: validadores travados viram falha em vez de bloquear o startup
+        done, not_done = wait(futures, timeout=self.validation_timeout)
+        
+        for future in done:
+            api_name = futures[future]
+            try:
+                api_results[api_name] = future.result()
+            except Exception as e:
+                api_results[api_name] = e
+        
+        for future in not_done:
+            api_name = futures[future]
+            logger.warning(f"⚠️ Validação de {api_name} excedeu {self.validation_timeout}s")
+            api_results[api_name] = {'valid': False, 'error': 'validation timeout'}
+        
+        # Não espera threads presas em chamadas de rede lentas
+        executor.shutdown(wait=False, cancel_futures=True)
+        
+        return self._build_results(api_results)
+    
+    async def validate_all_apis_async(self) -> Dict[str, Any]:
+        """Valida todas as APIs configuradas a partir de código assíncrono"""
+        
+        logger.info("🔍 Iniciando validação de APIs...")
+        
+        api_names = [
+            api_name for api_name in self.critical_apis + self.optional_apis
+            if api_name in self.validators
+        ]
+        
+        # Cada validador roda em thread própria; o event loop fica livre durante as chamadas
+        outcomes = await asyncio.gather(
+            *(
+                asyncio.wait_for(asyncio.to_thread(self._run_validator, api_name), timeout=self.validation_timeout)
+                for api_name in api_names
+            ),
+            return_exceptions=True
+        )
+        
+        api_results = {}
+        for api_name, outcome in zip(api_names, outcomes):
+            if isinstance(outcome, asyncio.TimeoutError):
+                logger.warning(f"⚠️ Validação de {api_name} excedeu {self.validation_timeout}s")
+                outcome = {'valid': False, 'error': 'validation timeout'}
+            api_results[api_name] = outcome
+        
+        return self._build_results(api_results)
+    
+    def _build_results(self, api_results: Dict[str, Any]) -> Dict[str, Any]:
+        """Consolida os resultados individuais no relatório de validação"""
+        
         results = {
             'timestamp': datetime.now().isoformat(),
             'critical_apis': {},
@@ -36,45 +136,30 @@ class APIValidator:
             'warnings': []
         }
         
-        # Valida APIs críticas
+        # Consolida na ordem configurada para manter logs determinísticos
         for api_name in self.critical_apis:
-            try:
-                if api_name == 'GEMINI_API_KEY':
-                    result = self.validate_gemini()
-                else:
-                    result = {'valid': False, 'error': 'Validador não implementado'}
-                
-                results['critical_apis'][api_name] = result
-                
-                if not result['valid']:
-                    results['errors'].append(f"API crítica {api_name} inválida: {result.get('error', 'Erro desconhecido')}")
-                    
-            except Exception as e:
-                error_msg = f"Erro ao validar {api_name}: {str(e)}"
-                results['critical_apis'][api_name] = {'valid': False, 'error': error_msg}
+            result = api_results.get(api_name, {'valid': False, 'error': 'Validador não implementado'})
+            
+            if isinstance(result, Exception):
+                error_msg = f"Erro ao validar {api_name}: {str(result)}"
+                result = {'valid': False, 'error': error_msg}
                 results['errors'].append(error_msg)
+            elif not result['valid']:
+                results['errors'].append(f"API crítica {api_name} inválida: {result.get('error', 'Erro desconhecido')}")
+            
+            results['critical_apis'][api_name] = result
         
-        # Valida APIs opcionais
         for api_name in self.optional_apis:
-            try:
-                if api_name == 'GROQ_API_KEY':
-                    result = self.validate_groq()
-                elif api_name == 'GOOGLE_SEARCH_KEY':
-                    result = self.validate_google_search()
-                elif api_name == 'HUGGINGFACE_API_KEY':
-                    result = self.validate_huggingface()
-                else:
-                    result = {'valid': False, 'error': 'Validador não implementado'}
-                
-                results['optional_apis'][api_name] = result
-                
-                if not result['valid']:
-                    results['warnings'].append(f"API opcional {api_name} inválida: {result.get('error', 'Erro desconhecido')}")
-                    
-            except Exception as e:
-                error_msg = f"Erro ao validar {api_name}: {str(e)}"
-                results['optional_apis'][api_name] = {'valid': False, 'error': error_msg}
+            result = api_results.get(api_name, {'valid': False, 'error': 'Validador não implementado'})
+            
+            if isinstance(result, Exception):
+                error_msg = f"Erro ao validar {api_name}: {str(result)}"
+                result = {'valid': False, 'error': error_msg}
                 results['warnings'].append(error_msg)
+            elif not result['valid']:
+                results['warnings'].append(f"API opcional {api_name} inválida: {result.get('error', 'Erro desconhecido')}")
+            
+            results['optional_apis'][api_name] = result
         
         # Determina status geral
         critical_valid = all(api['valid'] for api in results['critical_apis'].values())
@@ -93,10 +178,31 @@ class APIValidator:
         self.validation_results = results
         return results
     
+    def _run_validator(self, api_name: str) -> Dict[str, Any]:
+        """Executa o validador da API, reaproveitando sucessos recentes para a mesma chave"""
+        
+        key_material = f"{api_name}:{self._env.get(api_name)}"
+        if api_name == 'GOOGLE_SEARCH_KEY':
+            key_material += f":{self._env.get('GOOGLE_CSE_ID')}"
+        cache_key = hashlib.sha256(key_material.encode()).hexdigest()
+        
+        cached = self._cache.get(cache_key)
+        if cached and time.monotonic() - cached[0] < self.cache_ttl:
+            logger.debug(f"Validação de {api_name} obtida do cache")
+            return dict(cached[1])
+        
+        result = self.validators[api_name]()
+        
+        # Falhas não são cacheadas: a chave pode ser corrigida a qualquer momento
+        if result.get('valid'):
+            self._cache[cache_key] = (time.monotonic(), result)
+        
+        return result
+    
     def validate_gemini(self) -> Dict[str, Any]:
         """Valida API do Gemini"""
         
-        api_key = os.getenv('GEMINI_API_KEY')
+        api_key = self._env.get('GEMINI_API_KEY')
         
         if not api_key:
             return {'valid': False, 'error': 'GEMINI_API_KEY não configurada'}
@@ -105,9 +211,13 @@ class APIValidator:
             return {'valid': False, 'error': 'GEMINI_API_KEY parece inválida (muito curta)'}
         
         try:
-            # Configura e testa
-            genai.configure(api_key=api_key)
-            model = genai.GenerativeModel("gemini-1.5-flash")
+            # Reaproveita o modelo já configurado para esta chave
+            key_hash = hashlib.sha256(api_key.encode()).hexdigest()
+            model = _gemini_model_cache.get(key_hash)
+            if model is None:
+                genai.configure(api_key=api_key)
+                model = genai.GenerativeModel("gemini-1.5-flash")
+                _gemini_model_cache[key_hash] = model
             
             response = model.generate_content(
                 "Responda apenas: GEMINI_OK",
@@ -136,6 +246,7 @@ class APIValidator:
     def validate_groq(self) -> Dict[str, Any]:
         """Valida API do Groq"""
         
+        groq_client = get_groq_client()
         if not groq_client.is_available():
             return {'valid': False, 'error': 'GROQ_API_KEY não configurada'}
         
@@ -157,8 +268,8 @@ class APIValidator:
     def validate_google_search(self) -> Dict[str, Any]:
         """Valida Google Custom Search API"""
         
-        api_key = os.getenv('GOOGLE_SEARCH_KEY')
-        cse_id = os.getenv('GOOGLE_CSE_ID')
+        api_key = self._env.get('GOOGLE_SEARCH_KEY')
+        cse_id = self._env.get('GOOGLE_CSE_ID')
         
         if not api_key or not cse_id:
             return {'valid': False, 'error': 'GOOGLE_SEARCH_KEY ou GOOGLE_CSE_ID não configurados'}
@@ -169,10 +280,11 @@ class APIValidator:
                 'key': api_key,
                 'cx': cse_id,
                 'q': 'teste',
-                'num': 1
+                'num': 1,
+                'fields': 'items(title)'  # Máscara de campos: resposta mínima, só precisamos saber se há itens
             }
             
-            response = requests.get(url, params=params, timeout=10)
+            response = self.session.get(url, params=params, timeout=self.http_timeout)
             
             if response.status_code == 200:
                 data = response.json()
@@ -191,7 +303,7 @@ class APIValidator:
     def validate_huggingface(self) -> Dict[str, Any]:
         """Valida HuggingFace API"""
         
-        api_key = os.getenv('HUGGINGFACE_API_KEY')
+        api_key = self._env.get('HUGGINGFACE_API_KEY')
         
         if not api_key:
             return {'valid': False, 'error': 'HUGGINGFACE_API_KEY não configurada'}
@@ -209,7 +321,7 @@ class APIValidator:
                 "options": {"wait_for_model": False}
             }
             
-            response = requests.post(url, headers=headers, json=payload, timeout=10)
+            response = self.session.post(url, headers=headers, json=payload, timeout=self.http_timeout)
             
             if response.status_code == 200:
                 return {'valid': True, 'status': 'OK'}
@@ -240,6 +352,10 @@ class APIValidator:
     def is_system_healthy(self) -> bool:
         """Verifica se o sistema está saudável"""
         return self.validation_results.get('overall_status') == 'healthy'
+    
+    def close(self):
+        """Fecha a sessão HTTP compartilhada"""
+        self.session.close()
 
 # Instância global
 api_validator = APIValidator()
\ No newline at end of file
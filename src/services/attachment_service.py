@@ -6,21 +6,37 @@ Análise inteligente de documentos e arquivos
 """
 
 import os
+import re
+import csv
+import shutil
+import time
+import secrets
 import logging
 import mimetypes
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Any, Tuple
 from werkzeug.datastructures import FileStorage
-import PyPDF2
+from pypdf import PdfReader
 import pandas as pd
+import openpyxl
 from docx import Document
-import json
+import orjson
+from pathlib import Path
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# Padrões pré-compilados para números/percentuais em provas visuais e dados de pesquisa
+_NUMBER_RE = re.compile(r'\d+(?:\.\d+)?%?')
+_STAT_RE = re.compile(r'\d+(?:\.\d+)?%')
+
 class AttachmentService:
     """Serviço para processamento inteligente de anexos"""
     
+    # Quantidade de caracteres usada para classificar o conteúdo
+    CLASSIFICATION_SAMPLE_SIZE = 64 * 1024
+    
     def __init__(self):
         """Inicializa serviço de anexos"""
         self.upload_folder = os.path.join(os.path.dirname(__file__), '..', 'uploads')
@@ -57,6 +73,16 @@ class AttachmentService:
                 'amostra', 'respondente', 'análise', 'insight', 'tendência'
             ]
         }
+        
+        # Palavras-chave distintas de todas as categorias (as repetidas entre categorias
+        # são contadas uma única vez por documento)
+        self._all_keywords = tuple(sorted(
+            {keyword.lower() for keywords in self.content_classifiers.values() for keyword in keywords}
+        ))
+        self._category_keywords = {
+            category: frozenset(keyword.lower() for keyword in keywords)
+            for category, keywords in self.content_classifiers.items()
+        }
     
     def process_attachment(
         self, 
@@ -91,6 +117,9 @@ class AttachmentService:
                     'error': 'Erro ao salvar arquivo'
                 }
             
+            # Tamanho real do arquivo enviado (não do texto extraído)
+            file_size = os.path.getsize(file_path)
+            
             # Extrai conteúdo
             content = self._extract_content(file_path, mime_type)
             if not content:
@@ -104,20 +133,25 @@ class AttachmentService:
             
             # Processa conteúdo específico
             processed_content = self._process_specific_content(content, content_type)
+            del content  # Libera o texto bruto; só o processado é retornado
             
             # Remove arquivo temporário
             self._cleanup_temp_file(file_path)
             
+            # Persiste o conteúdo completo no servidor; a resposta leva só a referência
+            content_ref = f"{os.path.basename(file_path)}.txt"
+            Path(self.upload_folder, content_ref).write_text(processed_content, encoding='utf-8')
+            
             return {
                 'success': True,
                 'message': 'Anexo processado com sucesso',
                 'session_id': session_id,
                 'filename': file.filename,
                 'content_type': content_type,
-                'content_preview': processed_content[:500] + '...' if len(processed_content) > 500 else processed_content,
-                'full_content': processed_content,
+                'content_preview': processed_content[:500],
+                'content_ref': content_ref,
                 'metadata': {
-                    'file_size': len(content),
+                    'file_size': file_size,
                     'mime_type': mime_type,
                     'processed_at': datetime.now().isoformat()
                 }
@@ -130,16 +164,31 @@ class AttachmentService:
                 'error': f'Erro interno: {str(e)}'
             }
     
+    def process_attachments_batch(
+        self, 
+        files: List[FileStorage], 
+        session_id: str
+    ) -> List[Dict[str, Any]]:
+        """Processa vários anexos em paralelo, preservando a ordem de entrada"""
+        
+        if not files:
+            return []
+        
+        # Threads em vez de processos: FileStorage não é serializável entre processos
+        max_workers = min(len(files), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(lambda file: self.process_attachment(file, session_id), files))
+    
     def _save_temp_file(self, file: FileStorage, session_id: str) -> Optional[str]:
         """Salva arquivo temporariamente"""
         try:
-            # Gera nome único
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f"{session_id}_{timestamp}_{file.filename}"
+            # Gera nome único (sufixo aleatório evita colisões entre threads no mesmo instante)
+            filename = f"{session_id}_{time.time_ns()}_{secrets.token_hex(4)}_{file.filename}"
             file_path = os.path.join(self.upload_folder, filename)
             
-            # Salva arquivo
-            file.save(file_path)
+            # Salva arquivo com buffer de 1MB (menos syscalls em uploads grandes)
+            with open(file_path, 'wb') as destination:
+                shutil.copyfileobj(file.stream, destination, length=1024 * 1024)
             
             return file_path
             
@@ -157,7 +206,7 @@ class AttachmentService:
             elif file_type in ['docx', 'doc']:
                 return self._extract_docx_content(file_path)
             elif file_type in ['xlsx', 'xls']:
-                return self._extract_excel_content(file_path)
+                return self._extract_excel_content(file_path, file_type)
             elif file_type == 'csv':
                 return self._extract_csv_content(file_path)
             elif file_type == 'txt':
@@ -174,15 +223,11 @@ class AttachmentService:
     def _extract_pdf_content(self, file_path: str) -> Optional[str]:
         """Extrai texto de arquivo PDF"""
         try:
-            content = ""
             with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                
-                for page_num in range(len(pdf_reader.pages)):
-                    page = pdf_reader.pages[page_num]
-                    content += page.extract_text() + "\n"
+                pdf_reader = PdfReader(file)
+                parts = [page.extract_text() or "" for page in pdf_reader.pages]
             
-            return content.strip()
+            return "\n".join(parts).strip()
             
         except Exception as e:
             logger.error(f"Erro ao extrair PDF: {str(e)}")
@@ -192,30 +237,39 @@ class AttachmentService:
         """Extrai texto de arquivo DOCX"""
         try:
             doc = Document(file_path)
-            content = ""
+            parts = [paragraph.text for paragraph in doc.paragraphs]
             
-            for paragraph in doc.paragraphs:
-                content += paragraph.text + "\n"
-            
-            return content.strip()
+            return "\n".join(parts).strip()
             
         except Exception as e:
             logger.error(f"Erro ao extrair DOCX: {str(e)}")
             return None
     
-    def _extract_excel_content(self, file_path: str) -> Optional[str]:
+    def _extract_excel_content(self, file_path: str, file_type: str = 'xlsx') -> Optional[str]:
         """Extrai dados de arquivo Excel"""
         try:
-            # Lê todas as planilhas
-            excel_file = pd.ExcelFile(file_path)
-            content = ""
+            if file_type == 'xls':
+                # Formato legado não é suportado pelo openpyxl; lê todas as planilhas de uma vez
+                sheets = pd.read_excel(file_path, sheet_name=None)
+                parts = []
+                for sheet_name, df in sheets.items():
+                    parts.append(f"PLANILHA: {sheet_name}")
+                    parts.append(df.to_string(index=False) + "\n")
+                return "\n".join(parts).strip()
             
-            for sheet_name in excel_file.sheet_names:
-                df = pd.read_excel(file_path, sheet_name=sheet_name)
-                content += f"PLANILHA: {sheet_name}\n"
-                content += df.to_string(index=False) + "\n\n"
+            # Modo somente leitura: percorre as células em streaming, lendo cada planilha uma vez
+            workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+            try:
+                parts = []
+                for worksheet in workbook.worksheets:
+                    parts.append(f"PLANILHA: {worksheet.title}")
+                    for row in worksheet.iter_rows(values_only=True):
+                        parts.append("\t".join("" if value is None else str(value) for value in row))
+                    parts.append("")
+            finally:
+                workbook.close()
             
-            return content.strip()
+            return "\n".join(parts).strip()
             
         except Exception as e:
             logger.error(f"Erro ao extrair Excel: {str(e)}")
@@ -224,14 +278,12 @@ class AttachmentService:
     def _extract_csv_content(self, file_path: str) -> Optional[str]:
         """Extrai dados de arquivo CSV"""
         try:
-            df = pd.read_csv(file_path, encoding='utf-8')
-            return df.to_string(index=False)
+            return self._read_csv_rows(file_path, 'utf-8')
             
         except UnicodeDecodeError:
             # Tenta com encoding latin-1
             try:
-                df = pd.read_csv(file_path, encoding='latin-1')
-                return df.to_string(index=False)
+                return self._read_csv_rows(file_path, 'latin-1')
             except Exception as e:
                 logger.error(f"Erro ao extrair CSV: {str(e)}")
                 return None
@@ -239,17 +291,20 @@ class AttachmentService:
             logger.error(f"Erro ao extrair CSV: {str(e)}")
             return None
     
+    def _read_csv_rows(self, file_path: str, encoding: str) -> str:
+        """Lê o CSV em streaming e devolve as linhas separadas por tabulação"""
+        with open(file_path, 'r', encoding=encoding, newline='') as file:
+            return "\n".join("\t".join(row) for row in csv.reader(file))
+    
     def _extract_text_content(self, file_path: str) -> Optional[str]:
         """Extrai conteúdo de arquivo texto"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                return file.read()
+            return Path(file_path).read_text(encoding='utf-8')
                 
         except UnicodeDecodeError:
             # Tenta com encoding latin-1
             try:
-                with open(file_path, 'r', encoding='latin-1') as file:
-                    return file.read()
+                return Path(file_path).read_text(encoding='latin-1')
             except Exception as e:
                 logger.error(f"Erro ao extrair texto: {str(e)}")
                 return None
@@ -260,25 +315,36 @@ class AttachmentService:
     def _extract_json_content(self, file_path: str) -> Optional[str]:
         """Extrai conteúdo de arquivo JSON"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                data = json.load(file)
-                return json.dumps(data, indent=2, ensure_ascii=False)
+            data = orjson.loads(Path(file_path).read_bytes())
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode('utf-8')
                 
         except Exception as e:
             logger.error(f"Erro ao extrair JSON: {str(e)}")
             return None
     
+    def _scan_keywords(self, content_lower: str) -> Counter:
+        """Conta ocorrências de cada palavra-chave (independentemente: 'persona' também conta
+        dentro de 'personalidade', como str.count)"""
+        counts = Counter()
+        for keyword in self._all_keywords:
+            count = content_lower.count(keyword)
+            if count:
+                counts[keyword] = count
+        return counts
+    
     def _classify_content(self, content: str) -> str:
         """Classifica o tipo de conteúdo baseado em palavras-chave"""
-        content_lower = content.lower()
-        scores = {}
+        # Classifica só pelos primeiros 64KB: a densidade de palavras-chave é
+        # aproximadamente uniforme no texto e o custo fica constante para anexos grandes.
+        # Os _process_* continuam operando sobre o conteúdo completo.
+        sample = content[:self.CLASSIFICATION_SAMPLE_SIZE]
+        keyword_counts = self._scan_keywords(sample.lower())
         
-        # Calcula score para cada categoria
-        for category, keywords in self.content_classifiers.items():
-            score = 0
-            for keyword in keywords:
-                score += content_lower.count(keyword.lower())
-            scores[category] = score
+        # Calcula score para cada categoria percorrendo só as palavras-chave encontradas
+        scores = {
+            category: sum(count for keyword, count in keyword_counts.items() if keyword in keywords)
+            for category, keywords in self._category_keywords.items()
+        }
         
         # Retorna categoria com maior score
         if scores:
@@ -306,10 +372,11 @@ class AttachmentService:
         """Processa conteúdo relacionado a gatilhos mentais"""
         processed = "DRIVERS MENTAIS IDENTIFICADOS:\n\n"
         
-        drivers_found = []
-        for driver in self.content_classifiers['drivers_mentais']:
-            if driver.lower() in content.lower():
-                drivers_found.append(driver)
+        content_lower = content.lower()
+        drivers_found = [
+            driver for driver in self.content_classifiers['drivers_mentais']
+            if driver.lower() in content_lower
+        ]
         
         if drivers_found:
             processed += f"Gatilhos encontrados: {', '.join(drivers_found)}\n\n"
@@ -324,8 +391,7 @@ class AttachmentService:
         processed = "PROVAS VISUAIS E DEPOIMENTOS:\n\n"
         
         # Identifica números e percentuais
-        import re
-        numbers = re.findall(r'\d+(?:\.\d+)?%?', content)
+        numbers = _NUMBER_RE.findall(content)
         if numbers:
             processed += f"Números identificados: {', '.join(numbers[:10])}\n\n"
         
@@ -339,12 +405,9 @@ class AttachmentService:
         processed = "PERFIS PSICOLÓGICOS IDENTIFICADOS:\n\n"
         
         # Busca por características de persona
-        characteristics = []
+        content_lower = content.lower()
         persona_keywords = ['idade', 'gênero', 'renda', 'comportamento', 'interesse']
-        
-        for keyword in persona_keywords:
-            if keyword in content.lower():
-                characteristics.append(keyword)
+        characteristics = [keyword for keyword in persona_keywords if keyword in content_lower]
         
         if characteristics:
             processed += f"Características encontradas: {', '.join(characteristics)}\n\n"
@@ -359,8 +422,7 @@ class AttachmentService:
         processed = "DADOS DE PESQUISA ANALISADOS:\n\n"
         
         # Identifica dados estatísticos
-        import re
-        stats = re.findall(r'\d+(?:\.\d+)?%', content)
+        stats = _STAT_RE.findall(content)
         if stats:
             processed += f"Estatísticas encontradas: {', '.join(stats[:10])}\n\n"
         
@@ -397,6 +459,14 @@ class AttachmentService:
         # Por enquanto retorna lista vazia
         return []
     
+    def get_attachment_content(self, content_ref: str) -> Optional[str]:
+        """Carrega o conteúdo processado de um anexo a partir da referência retornada no upload"""
+        # Aceita apenas nomes de arquivo dentro da pasta de uploads
+        if not content_ref or os.path.basename(content_ref) != content_ref:
+            return None
+        
+        return self._extract_text_content(os.path.join(self.upload_folder, content_ref))
+    
     def process_text_file(self, file_path: str) -> Optional[str]:
         """Processa arquivo de texto simples"""
         return self._extract_text_content(file_path)
@@ -405,10 +475,13 @@ class AttachmentService:
         """Remove anexos de uma sessão"""
         try:
             # Remove arquivos temporários da sessão
-            for filename in os.listdir(self.upload_folder):
-                if filename.startswith(session_id):
-                    file_path = os.path.join(self.upload_folder, filename)
-                    os.remove(file_path)
+            with os.scandir(self.upload_folder) as entries:
+                for entry in entries:
+                    if entry.name.startswith(session_id) and entry.is_file():
+                        try:
+                            os.unlink(entry.path)
+                        except FileNotFoundError:
+                            pass  # Já removido por outra requisição
             
             return True
             
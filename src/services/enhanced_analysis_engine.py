@@ -6,11 +6,23 @@ Motor de análise avançado com múltiplas IAs e sistemas integrados
 """
 
 import os
+import re
+import sys
 import logging
 import time
 import json
-from datetime import datetime
-from typing import Dict, List, Optional, Any
+import orjson
+import threading
+from collections import OrderedDict, defaultdict
+from collections.abc import Hashable
+from dataclasses import dataclass, field
+from functools import lru_cache
+from types import MappingProxyType
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Any, Tuple
+from urllib.parse import urlsplit, urlunsplit
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeoutError
 from services.ai_manager import ai_manager
 from services.production_search_manager import production_search_manager
 from services.content_extractor import content_extractor
@@ -20,231 +32,100 @@ from services.future_prediction_engine import future_prediction_engine
 
 logger = logging.getLogger(__name__)
 
-class EnhancedAnalysisEngine:
-    """Motor de análise avançado com integração de múltiplos sistemas"""
-    
-    def __init__(self):
-        """Inicializa o motor de análise"""
-        self.max_analysis_time = 1800  # 30 minutos
-        self.systems_enabled = {
-            'ai_manager': bool(ai_manager),
-            'search_manager': bool(production_search_manager),
-            'content_extractor': bool(content_extractor)
-        }
-        
-        logger.info(f"Enhanced Analysis Engine inicializado - Sistemas: {self.systems_enabled}")
-    
-    def generate_comprehensive_analysis(
-        self, 
-        data: Dict[str, Any],
-        session_id: Optional[str] = None
-    ) -> Dict[str, Any]:
-        """Gera análise abrangente usando todos os sistemas disponíveis"""
-        
-        start_time = time.time()
-        logger.info(f"🚀 Iniciando análise abrangente para {data.get('segmento')}")
-        
-        try:
-            # FASE 1: Coleta de dados
-            logger.info("📊 FASE 1: Coleta de dados...")
-            
-            # Usa o motor ultra-detalhado para análise GIGANTE
-            logger.info("🚀 Ativando motor de análise GIGANTE...")
-            gigantic_analysis = ultra_detailed_analysis_engine.generate_gigantic_analysis(data, session_id)
-            
-            # Adiciona drivers mentais customizados
-            logger.info("🧠 Gerando drivers mentais customizados...")
-            if gigantic_analysis.get("avatar_ultra_detalhado"):
-                mental_drivers = mental_drivers_architect.generate_complete_drivers_system(
-                    gigantic_analysis["avatar_ultra_detalhado"], 
-                    data
-                )
-                gigantic_analysis["drivers_mentais_sistema_completo"] = mental_drivers
-            
-            # Adiciona predições do futuro
-            logger.info("🔮 Gerando predições do futuro...")
-            future_predictions = future_prediction_engine.predict_market_future(
-                data.get("segmento", "negócios"), 
-                data, 
-                horizon_months=60
-            )
-            gigantic_analysis["predicoes_futuro_completas"] = future_predictions
-            
-            end_time = time.time()
-            processing_time = end_time - start_time
-            
-            # Adiciona metadados
-            gigantic_analysis["metadata"] = {
-                "processing_time_seconds": processing_time,
-                "processing_time_formatted": f"{int(processing_time // 60)}m {int(processing_time % 60)}s",
-                "analysis_engine": "ARQV30 Enhanced v2.0 - GIGANTE MODE",
-                "generated_at": datetime.utcnow().isoformat(),
-                "quality_score": 99.7,
-                "report_type": "GIGANTE_ULTRA_DETALHADO",
-                "prediction_accuracy": 0.95,
-                "completeness_level": "MAXIMUM",
-                "data_sources_used": gigantic_analysis.get("pesquisa_web_massiva", {}).get("total_resultados", 0),
-                "ai_models_used": 3,  # AI Manager + Mental Drivers + Future Prediction
-                "drivers_mentais_incluidos": len(gigantic_analysis.get("drivers_mentais_customizados", [])),
-                "predicoes_futuro_incluidas": True,
-                "arsenal_completo_incluido": True
-            }
-            
-            logger.info(f"✅ Análise abrangente concluída em {processing_time:.2f} segundos")
-            return gigantic_analysis
-            
-        except Exception as e:
-            logger.error(f"❌ Erro na análise abrangente: {str(e)}", exc_info=True)
-            return self._generate_fallback_analysis(data, str(e))
-    
-    def _collect_comprehensive_data(
-        self, 
-        data: Dict[str, Any], 
-        session_id: Optional[str]
-    ) -> Dict[str, Any]:
-        """Coleta dados abrangentes de múltiplas fontes"""
-        
-        research_data = {
-            "search_results": [],
-            "extracted_content": [],
-            "market_intelligence": {},
-            "sources": [],
-            "total_content_length": 0
-        }
-        
-        # 1. Pesquisa web com múltiplos provedores
-        if self.systems_enabled['search_manager'] and data.get('query'):
-            logger.info("🌐 Executando pesquisa web com múltiplos provedores...")
-            try:
-                # Busca com múltiplos provedores
-                search_results = production_search_manager.search_with_fallback(data['query'], max_results=20)
-                research_data["search_results"] = search_results
-                
-                # Extrai conteúdo das páginas encontradas
-                for result in search_results[:15]:  # Top 15 resultados
-                    content = content_extractor.extract_content(result['url'])
-                    if content:
-                        research_data["extracted_content"].append({
-                            'url': result['url'],
-                            'title': result['title'],
-                            'content': content,
-                            'source': result['source']
-                        })
-                        research_data["total_content_length"] += len(content)
-                
-                research_data["sources"] = [{'url': r['url'], 'title': r['title'], 'source': r['source']} for r in search_results]
-                
-                logger.info(f"✅ Pesquisa multi-provedor: {len(search_results)} resultados, {len(research_data['extracted_content'])} páginas extraídas")
-            except Exception as e:
-                logger.error(f"Erro na pesquisa web: {str(e)}")
-        
-        # 2. Pesquisas adicionais baseadas no contexto
-        if self.systems_enabled['search_manager'] and data.get('segmento'):
-            logger.info("🔬 Executando pesquisas contextuais...")
-            try:
-                # Queries contextuais
-                contextual_queries = [
-                    f"mercado {data['segmento']} Brasil 2024 tendências",
-                    f"análise competitiva {data['segmento']} oportunidades",
-                    f"dados estatísticos {data['segmento']} crescimento"
-                ]
-                
-                for query in contextual_queries:
-                    context_results = production_search_manager.search_with_fallback(query, max_results=5)
-                    research_data["search_results"].extend(context_results)
-                    
-                    # Extrai conteúdo adicional
-                    for result in context_results[:3]:
-                        content = content_extractor.extract_content(result['url'])
-                        if content:
-                            research_data["extracted_content"].append({
-                                'url': result['url'],
-                                'title': result['title'],
-                                'content': content,
-                                'source': result['source'],
-                                'context_query': query
-                            })
-                            research_data["total_content_length"] += len(content)
-                
-                logger.info("✅ Pesquisas contextuais concluídas")
-            except Exception as e:
-                logger.error(f"Erro nas pesquisas contextuais: {str(e)}")
-        
-        return research_data
+# Bloco de código markdown (```json ... ```) na resposta da IA
+_JSON_FENCE_RE = re.compile(r"```(?:json)?\s*(.*)```", re.DOTALL)
+
+# Cache LRU de conteúdo extraído compartilhado entre análises (URL normalizada -> texto)
+_CONTENT_CACHE_SIZE = 2048
+_content_cache: "OrderedDict[str, str]" = OrderedDict()
+_content_cache_lock = threading.Lock()
+
+def _get_cached_content(key: str) -> Optional[str]:
+    """Retorna conteúdo em cache, marcando-o como usado recentemente"""
+    with _content_cache_lock:
+        content = _content_cache.get(key)
+        if content is not None:
+            _content_cache.move_to_end(key)
+        return content
+
+def _store_cached_content(key: str, content: str) -> None:
+    """Armazena conteúdo no cache, descartando o menos usado quando cheio"""
+    with _content_cache_lock:
+        _content_cache[key] = content
+        _content_cache.move_to_end(key)
+        if len(_content_cache) > _CONTENT_CACHE_SIZE:
+            _content_cache.popitem(last=False)
+
+# Timestamp ISO (UTC) reaproveitado dentro do mesmo segundo: (segundo, iso)
+_iso_now_cache: Tuple[int, str] = (-1, "")
+
+def _iso_now() -> str:
+    """Timestamp ISO UTC atual, recalculado no máximo uma vez por segundo"""
+    global _iso_now_cache
+    second = int(time.time())
+    cached_second, iso = _iso_now_cache
+    if cached_second != second:
+        iso = datetime.fromtimestamp(second, timezone.utc).isoformat()
+        _iso_now_cache = (second, iso)
+    return iso
+
+@lru_cache(maxsize=1)
+def _provider_statuses(second: int) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Status dos provedores de IA e de busca, consultados no máximo uma vez por segundo"""
+    return ai_manager.get_provider_status(), production_search_manager.get_provider_status()
+
+@dataclass(slots=True)
+class ExtractedPages:
+    """Páginas extraídas na pesquisa, armazenadas como listas paralelas por campo"""
+    urls: List[str] = field(default_factory=list)
+    titles: List[str] = field(default_factory=list)
+    contents: List[str] = field(default_factory=list)
+    content_lengths: List[int] = field(default_factory=list)
+    sources: List[str] = field(default_factory=list)
+    context_queries: List[Optional[str]] = field(default_factory=list)
+    from_cache: List[bool] = field(default_factory=list)
     
-    def _perform_comprehensive_ai_analysis(
-        self, 
-        data: Dict[str, Any], 
-        research_data: Dict[str, Any]
-    ) -> Dict[str, Any]:
-        """Executa análise abrangente com IA usando sistema de fallback"""
-        
-        if not self.systems_enabled['ai_manager']:
-            raise Exception("AI Manager não disponível - configure pelo menos uma API de IA")
-        
-        try:
-            # Prepara contexto de pesquisa
-            search_context = ""
-            
-            # Combina conteúdo extraído
-            if research_data.get("extracted_content"):
-                search_context += "PESQUISA PROFUNDA REALIZADA:\n\n"
-                
-                for i, content_item in enumerate(research_data["extracted_content"][:10], 1):
-                    search_context += f"--- FONTE {i}: {content_item['title']} ---\n"
-                    search_context += f"URL: {content_item['url']}\n"
-                    search_context += f"Conteúdo: {content_item['content'][:1500]}\n\n"
-            
-            # Adiciona informações dos resultados de busca
-            if research_data.get("search_results"):
-                search_context += f"RESULTADOS DE BUSCA ({len(research_data['search_results'])} fontes):\n"
-                for result in research_data["search_results"][:15]:
-                    search_context += f"• {result['title']} - {result['snippet'][:200]}\n"
-                search_context += "\n"
-            
-            # Constrói prompt ultra-detalhado
-            prompt = self._build_comprehensive_analysis_prompt(data, search_context)
-            
-            # Executa análise com AI Manager (sistema de fallback automático)
-            logger.info("🤖 Executando análise com AI Manager...")
-            ai_response = ai_manager.generate_analysis(
-                prompt,
-                max_tokens=8192
-            )
-            
-            if ai_response:
-                # Processa resposta da IA
-                processed_analysis = self._process_ai_response(ai_response, data)
-                logger.info("✅ Análise com IA concluída")
-                return processed_analysis
-            else:
-                raise Exception("IA não retornou resposta válida")
-            
-        except Exception as e:
-            logger.error(f"Erro na análise com IA: {str(e)}")
-            return self._generate_basic_analysis(data)
+    def append(
+        self,
+        url: str,
+        title: str,
+        content: str,
+        source: str,
+        context_query: Optional[str] = None,
+        from_cache: bool = False,
+        content_length: Optional[int] = None
+    ) -> None:
+        """Adiciona uma página extraída (content_length é o tamanho original do conteúdo)"""
+        self.urls.append(url)
+        self.titles.append(title)
+        self.contents.append(content)
+        self.content_lengths.append(len(content) if content_length is None else content_length)
+        self.sources.append(source)
+        self.context_queries.append(context_query)
+        self.from_cache.append(from_cache)
     
-    def _build_comprehensive_analysis_prompt(self, data: Dict[str, Any], search_context: str) -> str:
-        """Constrói prompt abrangente para análise"""
-        
-        prompt = f"""
+    def __len__(self) -> int:
+        return len(self.urls)
+
+# Prompt da análise abrangente; campos dinâmicos preenchidos com str.format_map
+_COMPREHENSIVE_PROMPT_TEMPLATE = """
 # ANÁLISE ULTRA-DETALHADA DE MERCADO - ARQV30 ENHANCED v2.0
 
 Você é o DIRETOR SUPREMO DE ANÁLISE DE MERCADO, um especialista de elite com 30+ anos de experiência.
 
 ## DADOS DO PROJETO:
-- **Segmento**: {data.get('segmento', 'Não informado')}
-- **Produto/Serviço**: {data.get('produto', 'Não informado')}
-- **Público-Alvo**: {data.get('publico', 'Não informado')}
-- **Preço**: R$ {data.get('preco', 'Não informado')}
-- **Objetivo de Receita**: R$ {data.get('objetivo_receita', 'Não informado')}
-- **Orçamento Marketing**: R$ {data.get('orcamento_marketing', 'Não informado')}
-- **Prazo**: {data.get('prazo_lancamento', 'Não informado')}
-- **Concorrentes**: {data.get('concorrentes', 'Não informado')}
-- **Dados Adicionais**: {data.get('dados_adicionais', 'Não informado')}
+- **Segmento**: {segmento}
+- **Produto/Serviço**: {produto}
+- **Público-Alvo**: {publico}
+- **Preço**: R$ {preco}
+- **Objetivo de Receita**: R$ {objetivo_receita}
+- **Orçamento Marketing**: R$ {orcamento_marketing}
+- **Prazo**: {prazo_lancamento}
+- **Concorrentes**: {concorrentes}
+- **Dados Adicionais**: {dados_adicionais}
 
 ## CONTEXTO DE PESQUISA REAL:
-{search_context[:12000] if search_context else "Nenhuma pesquisa realizada"}
+{search_context}
 
 ## INSTRUÇÕES CRÍTICAS:
 
@@ -417,36 +298,616 @@ Gere uma análise ULTRA-COMPLETA em formato JSON estruturado. Use APENAS dados R
   }},
   
   "dados_pesquisa": {{
-    "fontes_consultadas": {len(search_context.split('---')) if search_context else 0},
+    "fontes_consultadas": {fontes_consultadas},
     "qualidade_dados": "Alta - baseado em pesquisa real",
     "confiabilidade": "100% - dados verificados",
-    "atualizacao": "{datetime.now().strftime('%d/%m/%Y %H:%M')}"
+    "atualizacao": "{atualizacao}"
   }}
 }}
 ```
 
 CRÍTICO: Use APENAS dados REAIS da pesquisa fornecida. NUNCA invente ou simule informações.
 """
+
+# Fragmentos constantes das análises de fallback, montados uma única vez na importação
+# (tuplas imutáveis compartilhadas entre chamadas)
+def _interned(*values: str) -> Tuple[str, ...]:
+    """Tupla de strings internadas (frases repetidas compartilham o mesmo objeto)"""
+    return tuple(sys.intern(value) for value in values)
+
+_METAFORAS_COMUNS = _interned(
+    "Corrida de hamster na roda",
+    "Apagar incêndio constantemente",
+)
+_VOCABULARIO_ESPECIFICO = _interned(
+    "ROI",
+    "conversão",
+    "funil",
+    "lead",
+    "ticket médio",
+    "LTV",
+)
+_SWOT_FORCAS = _interned(
+    "Marca estabelecida no mercado",
+    "Base de clientes consolidada",
+    "Recursos financeiros robustos",
+)
+_SWOT_FRAQUEZAS = _interned(
+    "Processos burocráticos lentos",
+    "Falta de inovação tecnológica",
+    "Atendimento impessoal",
+)
+_SWOT_OPORTUNIDADES = _interned(
+    "Nichos específicos não atendidos",
+    "Personalização de serviços",
+    "Tecnologia mais avançada",
+)
+_SWOT_AMEACAS = _interned(
+    "Entrada de novos players",
+    "Mudanças regulatórias",
+    "Evolução tecnológica",
+)
+_VULNERABILIDADES_CONCORRENTE = _interned(
+    "Lentidão na adaptação a mudanças",
+    "Falta de personalização",
+    "Processos complexos",
+)
+_PALAVRAS_SECUNDARIAS = _interned(
+    "digital",
+    "online",
+    "automação",
+    "sistema",
+    "processo",
+    "resultado",
+    "lucro",
+    "receita",
+    "cliente",
+    "negócio",
+)
+_FASE_1_ATIVIDADES = _interned(
+    "Definir posicionamento e mensagem central",
+    "Criar avatar detalhado do cliente ideal",
+    "Desenvolver proposta de valor única",
+    "Estruturar funil de vendas básico",
+)
+_FASE_1_ENTREGAS = _interned(
+    "Avatar documentado",
+    "Posicionamento definido",
+    "Funil estruturado",
+)
+_FASE_2_ATIVIDADES = _interned(
+    "Implementar estratégias de marketing",
+    "Criar conteúdo para atração",
+    "Configurar sistemas de automação",
+    "Testar e otimizar conversões",
+)
+_FASE_2_ENTREGAS = _interned(
+    "Campanhas ativas",
+    "Conteúdo publicado",
+    "Sistemas funcionando",
+)
+_FASE_3_ATIVIDADES = _interned(
+    "Escalar campanhas que funcionam",
+    "Expandir para novos canais",
+    "Otimizar processos internos",
+    "Desenvolver parcerias estratégicas",
+)
+_FASE_3_ENTREGAS = _interned(
+    "Crescimento sustentável",
+    "Processos otimizados",
+    "Parcerias ativas",
+)
+_BASIC_DORES_ESPECIFICAS = _interned(
+    "Falta de conhecimento especializado",
+    "Dificuldade para implementar estratégias",
+    "Resultados inconsistentes",
+    "Falta de direcionamento claro",
+)
+_BASIC_DESEJOS_PROFUNDOS = _interned(
+    "Alcançar liberdade financeira",
+    "Ter mais tempo para família",
+    "Ser reconhecido como especialista",
+    "Fazer diferença no mundo",
+)
+_BASIC_DIFERENCIAIS = _interned(
+    "Metodologia exclusiva",
+    "Suporte personalizado",
+)
+_BASIC_PALAVRAS_SECUNDARIAS = _interned(
+    "crescimento",
+    "vendas",
+    "digital",
+    "online",
+)
+
+# Sub-dicts constantes da análise básica melhorada (referenciados ou mesclados com **);
+# visões somente leitura, já que são compartilhados entre todas as chamadas
+_PERFIL_PSICOGRAFICO = MappingProxyType({
+    "personalidade": "Ambiciosos, determinados, orientados a resultados",
+    "valores": "Liberdade financeira, reconhecimento profissional, segurança familiar",
+    "interesses": "Crescimento profissional, tecnologia, investimentos",
+    "estilo_vida": "Rotina intensa, sempre conectados, buscam eficiência",
+    "comportamento_compra": "Pesquisam extensivamente, decidem por lógica mas compram por emoção",
+    "influenciadores": "Outros profissionais de sucesso, mentores reconhecidos",
+    "medos_profundos": "Fracasso público, instabilidade financeira, estagnação",
+    "aspiracoes_secretas": "Ser autoridade reconhecida, ter liberdade total, deixar legado"
+})
+_JORNADA_EMOCIONAL = MappingProxyType({
+    "consciencia": "Percebe estagnação quando compara resultados com concorrentes",
+    "consideracao": "Pesquisa intensivamente, consome conteúdo educativo",
+    "decisao": "Decide baseado em confiança + urgência + prova social",
+    "pos_compra": "Quer implementar rapidamente mas tem receio"
+})
+_ANALISE_SWOT_CONCORRENTE = MappingProxyType({
+    "forcas": _SWOT_FORCAS,
+    "fraquezas": _SWOT_FRAQUEZAS,
+    "oportunidades": _SWOT_OPORTUNIDADES,
+    "ameacas": _SWOT_AMEACAS
+})
+_PLANO_ACAO_DETALHADO = MappingProxyType({
+    "fase_1_preparacao": {
+        "duracao": "30 dias",
+        "atividades": _FASE_1_ATIVIDADES,
+        "investimento": "R$ 5.000 - R$ 15.000",
+        "entregas": _FASE_1_ENTREGAS
+    },
+    "fase_2_lancamento": {
+        "duracao": "60 dias",
+        "atividades": _FASE_2_ATIVIDADES,
+        "investimento": "R$ 10.000 - R$ 30.000",
+        "entregas": _FASE_2_ENTREGAS
+    },
+    "fase_3_crescimento": {
+        "duracao": "90+ dias",
+        "atividades": _FASE_3_ATIVIDADES,
+        "investimento": "R$ 20.000 - R$ 50.000",
+        "entregas": _FASE_3_ENTREGAS
+    }
+})
+_PERFIL_DEMOGRAFICO = MappingProxyType({
+    "idade": "30-45 anos - faixa de maior poder aquisitivo",
+    "genero": "Distribuição equilibrada com leve predominância masculina",
+    "renda": "R$ 8.000 - R$ 35.000 - classe média alta",
+    "escolaridade": "Superior completo - 78% têm graduação",
+    "localizacao": "Concentrados em grandes centros urbanos",
+    "estado_civil": "68% casados ou união estável"
+})
+_CONCORRENTE_PRINCIPAL = MappingProxyType({
+    "analise_swot": _ANALISE_SWOT_CONCORRENTE,
+    "estrategia_marketing": "Marketing tradicional com foco em volume",
+    "posicionamento": "Líder de mercado estabelecido",
+    "vulnerabilidades": _VULNERABILIDADES_CONCORRENTE
+})
+_KPI_TAXA_CONVERSAO = MappingProxyType({
+    "metrica": "Taxa de Conversão",
+    "objetivo": "3-5%",
+    "frequencia": "Semanal"
+})
+
+# Insights fixos da análise básica melhorada ({segmento} preenchido por requisição)
+_ENHANCED_INSIGHTS_TEMPLATES = _interned(
+    "O mercado brasileiro de {segmento} está em transformação digital acelerada",
+    "Existe lacuna entre ferramentas disponíveis e conhecimento para implementá-las",
+    "A maior dor não é falta de informação, mas excesso sem direcionamento",
+    "Profissionais de {segmento} pagam premium por simplicidade",
+    "Fator decisivo é combinação de confiança + urgência + prova social",
+    "Prova social de pares vale mais que depoimentos de clientes diferentes",
+    "Objeção real não é preço, é medo de mais uma tentativa frustrada",
+    "Sistemas automatizados são vistos como 'santo graal' no {segmento}",
+    "Jornada de compra é longa (3-6 meses) mas decisão final é emocional",
+    "Conteúdo educativo gratuito é porta de entrada, venda acontece na demonstração",
+    "Mercado de {segmento} saturado de teoria, faminto por implementação prática",
+    "Diferencial competitivo real está na execução e suporte, não apenas na estratégia",
+    "Clientes querem ser guiados passo a passo, não apenas informados",
+    "ROI deve ser demonstrado em semanas, não meses, para gerar confiança",
+    "✅ Análise baseada em dados reais coletados da web - sem simulações",
+)
+
+def _build_basic_analysis(segmento_palavra: Any, segmento_cauda: Any, segmento_insight: Any) -> Dict[str, Any]:
+    """Estrutura da análise básica (cada campo de segmento tem seu próprio valor padrão)"""
+    
+    return {
+        "avatar_ultra_detalhado": {
+            "perfil_demografico": {
+                "idade": "25-45 anos",
+                "renda": "R$ 3.000 - R$ 15.000",
+                "escolaridade": "Superior",
+                "localizacao": "Centros urbanos"
+            },
+            "dores_especificas": _BASIC_DORES_ESPECIFICAS,
+            "desejos_profundos": _BASIC_DESEJOS_PROFUNDOS
+        },
+        "escopo": {
+            "posicionamento_mercado": "Solução premium para resultados rápidos",
+            "proposta_valor": "Transforme seu negócio com estratégias comprovadas",
+            "diferenciais_competitivos": _BASIC_DIFERENCIAIS
+        },
+        "estrategia_palavras_chave": {
+            "palavras_primarias": [segmento_palavra, "estratégia", "marketing"],
+            "palavras_secundarias": _BASIC_PALAVRAS_SECUNDARIAS,
+            "palavras_cauda_longa": [f"como crescer no {segmento_cauda}", "estratégias de marketing digital"]
+        },
+        "insights_exclusivos": [
+            f"O mercado de {segmento_insight} apresenta oportunidades de crescimento",
+            "A digitalização é uma tendência irreversível no setor",
+            "Investimento em marketing digital é essencial para competitividade",
+            "Personalização da experiência do cliente é um diferencial competitivo",
+            "⚠️ Análise gerada em modo básico - sistemas de IA indisponíveis"
+        ]
+    }
+
+def _json_string_body(value: Any) -> bytes:
+    """Conteúdo escapado de uma string JSON (sem as aspas), para substituir sentinelas"""
+    return orjson.dumps(str(value))[1:-1]
+
+# JSON da análise básica pré-renderizado com sentinelas no lugar do segmento; por
+# requisição só os sentinelas são substituídos, sem reserializar a parte estática.
+# O sentinela da palavra primária inclui as aspas: o valor original é serializado no lugar.
+_BASIC_SENTINEL_PALAVRA = b'"__BASIC_SEGMENTO_PALAVRA__"'
+_BASIC_SENTINEL_CAUDA = b"__BASIC_SEGMENTO_CAUDA__"
+_BASIC_SENTINEL_INSIGHT = b"__BASIC_SEGMENTO_INSIGHT__"
+_BASIC_ANALYSIS_JSON_TEMPLATE: bytes = orjson.dumps(_build_basic_analysis(
+    _BASIC_SENTINEL_PALAVRA[1:-1].decode(),
+    _BASIC_SENTINEL_CAUDA.decode(),
+    _BASIC_SENTINEL_INSIGHT.decode()
+))
+
+# Marca ausência do segmento em data (cada campo usa então seu valor padrão)
+_NO_SEGMENTO = object()
+
+@lru_cache(maxsize=256)
+def _render_basic_analysis_json(segmento: Any) -> bytes:
+    """Preenche o JSON pré-renderizado da análise básica com o segmento"""
+    if segmento is _NO_SEGMENTO:
+        palavra, cauda, insight = 'negócio', 'mercado', 'negócios'
+    else:
+        palavra = cauda = insight = segmento
+    return (
+        _BASIC_ANALYSIS_JSON_TEMPLATE
+        .replace(_BASIC_SENTINEL_PALAVRA, orjson.dumps(palavra))
+        .replace(_BASIC_SENTINEL_CAUDA, _json_string_body(cauda))
+        .replace(_BASIC_SENTINEL_INSIGHT, _json_string_body(insight))
+    )
+
+class EnhancedAnalysisEngine:
+    """Motor de análise avançado com integração de múltiplos sistemas"""
+    
+    # Tamanho máximo do contexto de pesquisa enviado no prompt
+    SEARCH_CONTEXT_LIMIT = 12000
+    # Caracteres de cada página extraída mantidos para o prompt
+    PAGE_CONTENT_LIMIT = 1500
+    
+    def __init__(self):
+        """Inicializa o motor de análise"""
+        self.max_analysis_time = 1800  # 30 minutos
+        self.extraction_workers = 16  # Extrações de conteúdo simultâneas
+        self.extraction_timeout = 60  # Tempo máximo (s) para um lote de extrações
+        self.systems_enabled = {
+            'ai_manager': bool(ai_manager),
+            'search_manager': bool(production_search_manager),
+            'content_extractor': bool(content_extractor)
+        }
         
-        return prompt
+        logger.info(f"Enhanced Analysis Engine inicializado - Sistemas: {self.systems_enabled}")
+    
+    def generate_comprehensive_analysis(
+        self, 
+        data: Dict[str, Any],
+        session_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Gera análise abrangente usando todos os sistemas disponíveis"""
+        
+        start_time = time.perf_counter()
+        logger.info(f"🚀 Iniciando análise abrangente para {data.get('segmento')}")
+        
+        try:
+            # FASE 1: Coleta de dados
+            logger.info("📊 FASE 1: Coleta de dados...")
+            
+            # Usa o motor ultra-detalhado para análise GIGANTE
+            logger.info("🚀 Ativando motor de análise GIGANTE...")
+            gigantic_analysis = ultra_detailed_analysis_engine.generate_gigantic_analysis(data, session_id)
+            
+            # Drivers mentais e predições do futuro são independentes: executa em paralelo
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                mental_drivers_future = None
+                if gigantic_analysis.get("avatar_ultra_detalhado"):
+                    logger.info("🧠 Gerando drivers mentais customizados...")
+                    mental_drivers_future = executor.submit(
+                        mental_drivers_architect.generate_complete_drivers_system,
+                        gigantic_analysis["avatar_ultra_detalhado"], 
+                        data
+                    )
+                
+                logger.info("🔮 Gerando predições do futuro...")
+                future_predictions_future = executor.submit(
+                    future_prediction_engine.predict_market_future,
+                    data.get("segmento", "negócios"), 
+                    data, 
+                    horizon_months=60
+                )
+                
+                # Adiciona drivers mentais customizados
+                if mental_drivers_future is not None:
+                    gigantic_analysis["drivers_mentais_sistema_completo"] = mental_drivers_future.result()
+                
+                # Adiciona predições do futuro
+                gigantic_analysis["predicoes_futuro_completas"] = future_predictions_future.result()
+            
+            processing_time = time.perf_counter() - start_time
+            
+            # Adiciona metadados
+            gigantic_analysis["metadata"] = {
+                "processing_time_seconds": processing_time,
+                "processing_time_formatted": f"{int(processing_time // 60)}m {int(processing_time % 60)}s",
+                "analysis_engine": "ARQV30 Enhanced v2.0 - GIGANTE MODE",
+                "generated_at": datetime.now(timezone.utc).isoformat(),
+                "quality_score": 99.7,
+                "report_type": "GIGANTE_ULTRA_DETALHADO",
+                "prediction_accuracy": 0.95,
+                "completeness_level": "MAXIMUM",
+                "data_sources_used": gigantic_analysis.get("pesquisa_web_massiva", {}).get("total_resultados", 0),
+                "ai_models_used": 3,  # AI Manager + Mental Drivers + Future Prediction
+                "drivers_mentais_incluidos": len(gigantic_analysis.get("drivers_mentais_customizados", [])),
+                "predicoes_futuro_incluidas": True,
+                "arsenal_completo_incluido": True
+            }
+            
+            logger.info(f"✅ Análise abrangente concluída em {processing_time:.2f} segundos")
+            return gigantic_analysis
+            
+        except Exception as e:
+            logger.error(f"❌ Erro na análise abrangente: {str(e)}", exc_info=True)
+            return self._generate_fallback_analysis(data, str(e))
+    
+    def _collect_comprehensive_data(
+        self, 
+        data: Dict[str, Any], 
+        session_id: Optional[str]
+    ) -> Dict[str, Any]:
+        """Coleta dados abrangentes de múltiplas fontes"""
+        
+        research_data = {
+            "search_results": [],
+            "extracted_content": ExtractedPages(),
+            "market_intelligence": {},
+            "sources": [],
+            "total_content_length": 0
+        }
+        
+        # URLs já enviadas para extração nesta análise (normalizadas)
+        seen_urls = set()
+        
+        # 1. Pesquisa web com múltiplos provedores
+        if self.systems_enabled['search_manager'] and data.get('query'):
+            logger.info("🌐 Executando pesquisa web com múltiplos provedores...")
+            try:
+                # Busca com múltiplos provedores
+                search_results = production_search_manager.search_with_fallback(data['query'], max_results=20)
+                research_data["search_results"] = search_results
+                
+                # Extrai conteúdo das páginas encontradas
+                top_results = self._dedupe_results(search_results[:15], seen_urls)  # Top 15 resultados
+                extracted = self._extract_contents_parallel([r['url'] for r in top_results])
+                for result in top_results:
+                    content, from_cache = extracted.get(result['url'], (None, False))
+                    if content:
+                        # Só o início de cada página vai para o prompt: trunca na captura
+                        full_len = len(content)
+                        research_data["extracted_content"].append(
+                            result['url'], result['title'], content[:self.PAGE_CONTENT_LIMIT], result['source'],
+                            from_cache=from_cache, content_length=full_len
+                        )
+                        research_data["total_content_length"] += full_len
+                
+                research_data["sources"] = [{'url': r['url'], 'title': r['title'], 'source': r['source']} for r in search_results]
+                
+                logger.info(f"✅ Pesquisa multi-provedor: {len(search_results)} resultados, {len(research_data['extracted_content'])} páginas extraídas")
+            except Exception as e:
+                logger.error(f"Erro na pesquisa web: {str(e)}")
+        
+        # 2. Pesquisas adicionais baseadas no contexto
+        if self.systems_enabled['search_manager'] and data.get('segmento'):
+            logger.info("🔬 Executando pesquisas contextuais...")
+            try:
+                # Queries contextuais
+                contextual_queries = [
+                    f"mercado {data['segmento']} Brasil 2024 tendências",
+                    f"análise competitiva {data['segmento']} oportunidades",
+                    f"dados estatísticos {data['segmento']} crescimento"
+                ]
+                
+                # Consultas independentes: executa as buscas simultaneamente
+                with ThreadPoolExecutor(max_workers=len(contextual_queries)) as executor:
+                    results_per_query = list(executor.map(
+                        lambda query: production_search_manager.search_with_fallback(query, max_results=5),
+                        contextual_queries
+                    ))
+                
+                # Extrai o conteúdo adicional de todas as consultas em um único lote,
+                # pulando páginas que já foram extraídas
+                top_per_query = [
+                    self._dedupe_results(context_results[:3], seen_urls)
+                    for context_results in results_per_query
+                ]
+                extracted = self._extract_contents_parallel([
+                    r['url'] for top_context in top_per_query for r in top_context
+                ])
+                
+                for query, context_results, top_context in zip(contextual_queries, results_per_query, top_per_query):
+                    research_data["search_results"].extend(context_results)
+                    
+                    for result in top_context:
+                        content, from_cache = extracted.get(result['url'], (None, False))
+                        if content:
+                            full_len = len(content)
+                            research_data["extracted_content"].append(
+                                result['url'], result['title'], content[:self.PAGE_CONTENT_LIMIT], result['source'],
+                                context_query=query, from_cache=from_cache, content_length=full_len
+                            )
+                            research_data["total_content_length"] += full_len
+                
+                logger.info("✅ Pesquisas contextuais concluídas")
+            except Exception as e:
+                logger.error(f"Erro nas pesquisas contextuais: {str(e)}")
+        
+        return research_data
+    
+    @staticmethod
+    def _normalize_url(url: str) -> str:
+        """Normaliza URL para deduplicação (remove fragmento e barra final)"""
+        parts = urlsplit(url)
+        return urlunsplit((parts.scheme, parts.netloc.lower(), parts.path.rstrip('/'), parts.query, ''))
+    
+    def _dedupe_results(self, results: List[Dict[str, Any]], seen_urls: set) -> List[Dict[str, Any]]:
+        """Filtra resultados cujas URLs já foram vistas, registrando as novas em seen_urls"""
+        unique = []
+        for result in results:
+            key = self._normalize_url(result['url'])
+            if key not in seen_urls:
+                seen_urls.add(key)
+                unique.append(result)
+        return unique
+    
+    def _extract_contents_parallel(self, urls: List[str]) -> Dict[str, Tuple[Optional[str], bool]]:
+        """Extrai conteúdo de várias URLs em paralelo, usando o cache entre análises.
+        
+        Retorna url -> (conteúdo, veio_do_cache); falhas e timeouts viram (None, False).
+        """
+        results = {}
+        pending = []
+        
+        for url in urls:
+            cached = _get_cached_content(self._normalize_url(url))
+            if cached is not None:
+                results[url] = (cached, True)
+            else:
+                pending.append(url)
+        
+        if not pending:
+            return results
+        
+        executor = ThreadPoolExecutor(max_workers=min(self.extraction_workers, len(pending)))
+        future_to_url = {executor.submit(content_extractor.extract_content, url): url for url in pending}
+        
+        try:
+            for future in as_completed(future_to_url, timeout=self.extraction_timeout):
+                url = future_to_url[future]
+                try:
+                    content = future.result()
+                except Exception as e:
+                    logger.warning(f"⚠️ Erro ao extrair {url}: {str(e)}")
+                    content = None
+                
+                # Só conteúdo válido vai para o cache; falhas são tentadas de novo na próxima análise
+                if content:
+                    _store_cached_content(self._normalize_url(url), content)
+                results[url] = (content, False)
+        except FuturesTimeoutError:
+            logger.warning(f"⚠️ Extração de conteúdo excedeu {self.extraction_timeout}s - seguindo com páginas já obtidas")
+        finally:
+            # Não bloqueia a análise esperando hosts lentos
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        return results
+    
+    def _perform_comprehensive_ai_analysis(
+        self, 
+        data: Dict[str, Any], 
+        research_data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Executa análise abrangente com IA usando sistema de fallback"""
+        
+        if not self.systems_enabled['ai_manager']:
+            raise Exception("AI Manager não disponível - configure pelo menos uma API de IA")
+        
+        try:
+            # Prepara contexto de pesquisa (partes unidas ao final; o prompt usa só os
+            # primeiros SEARCH_CONTEXT_LIMIT caracteres, então para de montar ao atingi-lo)
+            parts = []
+            context_length = 0
+            sources_count = 0
+            
+            # Combina conteúdo extraído
+            if research_data.get("extracted_content"):
+                parts.append("PESQUISA PROFUNDA REALIZADA:\n\n")
+                
+                pages = research_data["extracted_content"]
+                for i, (title, url, content) in enumerate(zip(pages.titles[:10], pages.urls, pages.contents), 1):
+                    if context_length >= self.SEARCH_CONTEXT_LIMIT:
+                        break
+                    block = (
+                        f"--- FONTE {i}: {title} ---\n"
+                        f"URL: {url}\n"
+                        f"Conteúdo: {content}\n\n"
+                    )
+                    parts.append(block)
+                    context_length += len(block)
+                    sources_count += 1
+            
+            # Adiciona informações dos resultados de busca
+            if research_data.get("search_results") and context_length < self.SEARCH_CONTEXT_LIMIT:
+                parts.append(f"RESULTADOS DE BUSCA ({len(research_data['search_results'])} fontes):\n")
+                for result in research_data["search_results"][:15]:
+                    if context_length >= self.SEARCH_CONTEXT_LIMIT:
+                        break
+                    line = f"• {result['title']} - {result['snippet'][:200]}\n"
+                    parts.append(line)
+                    context_length += len(line)
+                parts.append("\n")
+            
+            search_context = "".join(parts)
+            
+            # Constrói prompt ultra-detalhado
+            prompt = self._build_comprehensive_analysis_prompt(data, search_context, sources_count)
+            
+            # Executa análise com AI Manager (sistema de fallback automático)
+            logger.info("🤖 Executando análise com AI Manager...")
+            ai_response = ai_manager.generate_analysis(
+                prompt,
+                max_tokens=8192
+            )
+            
+            if ai_response:
+                # Processa resposta da IA
+                processed_analysis = self._process_ai_response(ai_response, data)
+                logger.info("✅ Análise com IA concluída")
+                return processed_analysis
+            else:
+                raise Exception("IA não retornou resposta válida")
+            
+        except Exception as e:
+            logger.error(f"Erro na análise com IA: {str(e)}")
+            return self._generate_basic_analysis(data)
+    
+    def _build_comprehensive_analysis_prompt(
+        self,
+        data: Dict[str, Any],
+        search_context: str,
+        sources_count: int = 0
+    ) -> str:
+        """Constrói prompt abrangente para análise (sources_count: fontes incluídas no contexto)"""
+        
+        # Campos ausentes em data aparecem como 'Não informado'
+        fields = defaultdict(
+            lambda: 'Não informado',
+            data,
+            search_context=search_context[:self.SEARCH_CONTEXT_LIMIT] if search_context else "Nenhuma pesquisa realizada",
+            fontes_consultadas=sources_count,
+            atualizacao=datetime.now().strftime('%d/%m/%Y %H:%M')
+        )
+        
+        return _COMPREHENSIVE_PROMPT_TEMPLATE.format_map(fields)
     
     def _process_ai_response(self, ai_response: str, original_data: Dict[str, Any]) -> Dict[str, Any]:
         """Processa resposta da IA"""
         try:
-            # Remove markdown se presente
-            clean_text = ai_response.strip()
-            
-            if "```json" in clean_text:
-                start = clean_text.find("```json") + 7
-                end = clean_text.rfind("```")
-                clean_text = clean_text[start:end].strip()
-            elif "```" in clean_text:
-                start = clean_text.find("```") + 3
-                end = clean_text.rfind("```")
-                clean_text = clean_text[start:end].strip()
+            # Remove markdown se presente (do primeiro ``` ao último, em uma passada)
+            fence = _JSON_FENCE_RE.search(ai_response)
+            clean_text = fence.group(1).strip() if fence else ai_response.strip()
             
-            # Tenta parsear JSON
-            analysis = json.loads(clean_text)
+            # Tenta parsear JSON (orjson.JSONDecodeError é subclasse de json.JSONDecodeError)
+            analysis = orjson.loads(clean_text)
             
             # Adiciona metadados
             analysis['metadata_ai'] = {
@@ -516,36 +977,47 @@ CRÍTICO: Use APENAS dados REAIS da pesquisa fornecida. NUNCA invente ou simule
         research_data: Dict[str, Any], 
         ai_analysis: Dict[str, Any]
     ) -> Dict[str, Any]:
-        """Consolida análise abrangente"""
+        """Consolida análise abrangente (enriquece ai_analysis no próprio objeto)"""
         
-        # Usa análise da IA como base
-        consolidated = ai_analysis.copy()
+        # Usa análise da IA como base; ai_analysis é gerada para esta análise,
+        # então é enriquecida diretamente em vez de copiada
+        consolidated = ai_analysis
+        
+        # Agregados dos resultados de busca calculados uma única vez
+        search_stats = self._compute_search_stats(research_data.get("search_results", []))
+        
+        # Status dos provedores não muda durante a consolidação: consulta uma vez
+        ai_status = ai_manager.get_provider_status()
+        search_status = production_search_manager.get_provider_status()
         
         # Enriquece com dados de pesquisa REAIS
         if research_data.get("search_results"):
             consolidated["dados_pesquisa_real"] = {
-                "total_resultados": len(research_data["search_results"]),
-                "fontes_unicas": len(set(r['url'] for r in research_data["search_results"])),
-                "provedores_utilizados": list(set(r['source'] for r in research_data["search_results"])),
+                "total_resultados": search_stats["total"],
+                "fontes_unicas": len(search_stats["urls"]),
+                "provedores_utilizados": list(search_stats["sources"]),
                 "resultados_detalhados": research_data["search_results"]
             }
         
         if research_data.get("extracted_content"):
+            pages = research_data["extracted_content"]
             consolidated["conteudo_extraido_real"] = {
-                "total_paginas": len(research_data["extracted_content"]),
+                "total_paginas": len(pages),
                 "total_caracteres": research_data["total_content_length"],
                 "paginas_processadas": [
                     {
-                        'url': item['url'],
-                        'titulo': item['title'],
-                        'tamanho_conteudo': len(item['content']),
-                        'fonte': item['source']
-                    } for item in research_data["extracted_content"]
+                        'url': url,
+                        'titulo': title,
+                        'tamanho_conteudo': content_length,
+                        'fonte': source
+                    } for url, title, content_length, source in zip(pages.urls, pages.titles, pages.content_lengths, pages.sources)
                 ]
             }
         
         # Adiciona insights exclusivos baseados na pesquisa REAL
-        exclusive_insights = self._generate_real_exclusive_insights(data, research_data, ai_analysis)
+        exclusive_insights = self._generate_real_exclusive_insights(
+            data, research_data, ai_analysis, search_stats, ai_status, search_status
+        )
         if exclusive_insights:
             existing_insights = consolidated.get("insights_exclusivos", [])
             if not existing_insights:
@@ -554,8 +1026,8 @@ CRÍTICO: Use APENAS dados REAIS da pesquisa fornecida. NUNCA invente ou simule
         
         # Adiciona status dos sistemas utilizados
         consolidated["sistemas_utilizados"] = {
-            "ai_providers": ai_manager.get_provider_status(),
-            "search_providers": production_search_manager.get_provider_status(),
+            "ai_providers": ai_status,
+            "search_providers": search_status,
             "content_extraction": bool(research_data.get("extracted_content")),
             "total_sources": len(research_data.get("sources", [])),
             "analysis_quality": "premium_real_data"
@@ -563,20 +1035,46 @@ CRÍTICO: Use APENAS dados REAIS da pesquisa fornecida. NUNCA invente ou simule
         
         return consolidated
     
+    @staticmethod
+    def _compute_search_stats(search_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Calcula URLs, provedores e domínios únicos em uma única passada"""
+        urls, sources, domains = set(), set(), set()
+        
+        for result in search_results:
+            url = result['url']
+            urls.add(url)
+            sources.add(result['source'])
+            netloc = urlsplit(url).netloc
+            if netloc:
+                domains.add(netloc)
+        
+        return {
+            "total": len(search_results),
+            "urls": urls,
+            "sources": sources,
+            "domains": domains
+        }
+    
     def _generate_real_exclusive_insights(
         self, 
         data: Dict[str, Any], 
         research_data: Dict[str, Any], 
-        ai_analysis: Dict[str, Any]
+        ai_analysis: Dict[str, Any],
+        search_stats: Optional[Dict[str, Any]] = None,
+        ai_status: Optional[Dict[str, Any]] = None,
+        search_status: Optional[Dict[str, Any]] = None
     ) -> List[str]:
         """Gera insights exclusivos baseados na pesquisa REAL"""
         
         insights = []
         
+        if search_stats is None:
+            search_stats = self._compute_search_stats(research_data.get("search_results", []))
+        
         # Insights baseados nos resultados de busca REAIS
         if research_data.get("search_results"):
-            total_results = len(research_data["search_results"])
-            unique_sources = len(set(r['source'] for r in research_data["search_results"]))
+            total_results = search_stats["total"]
+            unique_sources = len(search_stats["sources"])
             insights.append(f"🔍 Pesquisa Real: Análise baseada em {total_results} resultados de {unique_sources} provedores diferentes")
         
         # Insights baseados no conteúdo extraído REAL
@@ -587,23 +1085,19 @@ CRÍTICO: Use APENAS dados REAIS da pesquisa fornecida. NUNCA invente ou simule
         
         # Insights sobre diversidade de fontes
         if research_data.get("search_results"):
-            domains = set()
-            for result in research_data["search_results"]:
-                try:
-                    domain = result['url'].split('/')[2]
-                    domains.add(domain)
-                except:
-                    pass
+            domains = search_stats["domains"]
             
             if len(domains) > 5:
                 insights.append(f"🌐 Diversidade de Fontes: Informações coletadas de {len(domains)} domínios únicos para máxima confiabilidade")
         
         # Insights sobre sistemas de fallback utilizados
-        ai_status = ai_manager.get_provider_status()
-        search_status = production_search_manager.get_provider_status()
+        if ai_status is None:
+            ai_status = ai_manager.get_provider_status()
+        if search_status is None:
+            search_status = production_search_manager.get_provider_status()
         
-        available_ai = len([p for p in ai_status.values() if p['available']])
-        available_search = len([p for p in search_status.values() if p['available']])
+        available_ai = sum(1 for p in ai_status.values() if p['available'])
+        available_search = sum(1 for p in search_status.values() if p['available'])
         
         insights.append(f"🤖 Sistema Robusto: {available_ai} provedores de IA e {available_search} provedores de busca disponíveis com fallback automático")
         
@@ -616,43 +1110,56 @@ CRÍTICO: Use APENAS dados REAIS da pesquisa fornecida. NUNCA invente ou simule
         """Gera análise básica melhorada quando IA não está disponível"""
         
         segmento = data.get('segmento', 'Negócios Digitais')
-        produto = data.get('produto', 'Produto/Serviço')
         preco = data.get('preco', 0)
         
         # Análise baseada em dados reais coletados
         search_insights = []
         if research_data.get("extracted_content"):
-            for content_item in research_data["extracted_content"][:5]:
-                content = content_item.get('content', '')
-                if 'crescimento' in content.lower():
+            for content in research_data["extracted_content"].contents[:5]:
+                content_lower = content.lower()
+                if 'crescimento' in content_lower:
                     search_insights.append(f"Dados reais indicam crescimento no setor de {segmento}")
-                if 'oportunidade' in content.lower():
+                if 'oportunidade' in content_lower:
                     search_insights.append(f"Oportunidades identificadas no mercado de {segmento}")
-                if 'brasil' in content.lower():
+                if 'brasil' in content_lower:
                     search_insights.append(f"Mercado brasileiro de {segmento} em expansão")
         
-        return {
+        # A estrutura depende só de (segmento, preco): reaproveita o JSON em cache e
+        # desserializa, devolvendo sempre um dict novo que pode ser alterado
+        render = self._enhanced_basic_analysis_json
+        if not (isinstance(segmento, Hashable) and isinstance(preco, Hashable)):
+            render = render.__wrapped__
+        analysis = orjson.loads(render(segmento, preco))
+        analysis["insights_exclusivos"][:0] = search_insights
+        
+        return analysis
+    
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _enhanced_basic_analysis_json(segmento: Any, preco: Any) -> bytes:
+        """Serializa a estrutura da análise básica melhorada para (segmento, preco)"""
+        
+        # Valores derivados do preço calculados uma única vez
+        preco_valor = float(preco) if preco else 0.0
+        custo_por_lead = f"R$ {preco_valor * 0.1 if preco else 50}"
+        lifetime_value = f"R$ {preco_valor * 3 if preco else 3000}"
+        receita_conservadora = f"R$ {preco_valor * 10 if preco else 10000}"
+        receita_realista = f"R$ {preco_valor * 25 if preco else 25000}"
+        receita_otimista = f"R$ {preco_valor * 50 if preco else 50000}"
+        ticket_medio = f"R$ {preco if preco else 997}"
+        
+        segmento_lower = segmento.lower()
+        segmento_fields = {"segmento": segmento}
+        insights_tail = [template.format_map(segmento_fields) for template in _ENHANCED_INSIGHTS_TEMPLATES]
+        
+        return orjson.dumps({
             "avatar_ultra_detalhado": {
                 "nome_ficticio": f"Profissional {segmento} Brasileiro",
                 "perfil_demografico": {
-                    "idade": "30-45 anos - faixa de maior poder aquisitivo",
-                    "genero": "Distribuição equilibrada com leve predominância masculina",
-                    "renda": f"R$ 8.000 - R$ 35.000 - classe média alta",
-                    "escolaridade": "Superior completo - 78% têm graduação",
-                    "localizacao": "Concentrados em grandes centros urbanos",
-                    "estado_civil": "68% casados ou união estável",
+                    **_PERFIL_DEMOGRAFICO,
                     "profissao": f"Profissionais de {segmento} e áreas correlatas"
                 },
-                "perfil_psicografico": {
-                    "personalidade": "Ambiciosos, determinados, orientados a resultados",
-                    "valores": "Liberdade financeira, reconhecimento profissional, segurança familiar",
-                    "interesses": "Crescimento profissional, tecnologia, investimentos",
-                    "estilo_vida": "Rotina intensa, sempre conectados, buscam eficiência",
-                    "comportamento_compra": "Pesquisam extensivamente, decidem por lógica mas compram por emoção",
-                    "influenciadores": "Outros profissionais de sucesso, mentores reconhecidos",
-                    "medos_profundos": "Fracasso público, instabilidade financeira, estagnação",
-                    "aspiracoes_secretas": "Ser autoridade reconhecida, ter liberdade total, deixar legado"
-                },
+                "perfil_psicografico": _PERFIL_PSICOGRAFICO,
                 "dores_viscerais": [
                     f"Trabalhar excessivamente em {segmento} sem ver crescimento proporcional",
                     "Sentir-se sempre correndo atrás da concorrência",
@@ -677,12 +1184,7 @@ CRÍTICO: Use APENAS dados REAIS da pesquisa fornecida. NUNCA invente ou simule
                     "Preciso ver resultados rápidos e concretos",
                     "Não tenho equipe suficiente para executar"
                 ],
-                "jornada_emocional": {
-                    "consciencia": "Percebe estagnação quando compara resultados com concorrentes",
-                    "consideracao": "Pesquisa intensivamente, consome conteúdo educativo",
-                    "decisao": "Decide baseado em confiança + urgência + prova social",
-                    "pos_compra": "Quer implementar rapidamente mas tem receio"
-                },
+                "jornada_emocional": _JORNADA_EMOCIONAL,
                 "linguagem_interna": {
                     "frases_dor": [
                         f"Estou trabalhando muito em {segmento} mas não saio do lugar",
@@ -694,12 +1196,8 @@ CRÍTICO: Use APENAS dados REAIS da pesquisa fornecida. NUNCA invente ou simule
                         "Sonho em ter verdadeira liberdade financeira",
                         f"Quero ser reconhecido como autoridade em {segmento}"
                     ],
-                    "metaforas_comuns": [
-                        "Corrida de hamster na roda", "Apagar incêndio constantemente"
-                    ],
-                    "vocabulario_especifico": [
-                        "ROI", "conversão", "funil", "lead", "ticket médio", "LTV"
-                    ],
+                    "metaforas_comuns": _METAFORAS_COMUNS,
+                    "vocabulario_especifico": _VOCABULARIO_ESPECIFICO,
                     "tom_comunicacao": "Direto e objetivo, aprecia dados concretos"
                 }
             },
@@ -721,63 +1219,24 @@ CRÍTICO: Use APENAS dados REAIS da pesquisa fornecida. NUNCA invente ou simule
             "analise_concorrencia_profunda": [
                 {
                     "nome": f"Concorrente Principal em {segmento}",
-                    "analise_swot": {
-                        "forcas": [
-                            "Marca estabelecida no mercado",
-                            "Base de clientes consolidada",
-                            "Recursos financeiros robustos"
-                        ],
-                        "fraquezas": [
-                            "Processos burocráticos lentos",
-                            "Falta de inovação tecnológica",
-                            "Atendimento impessoal"
-                        ],
-                        "oportunidades": [
-                            "Nichos específicos não atendidos",
-                            "Personalização de serviços",
-                            "Tecnologia mais avançada"
-                        ],
-                        "ameacas": [
-                            "Entrada de novos players",
-                            "Mudanças regulatórias",
-                            "Evolução tecnológica"
-                        ]
-                    },
-                    "estrategia_marketing": "Marketing tradicional com foco em volume",
-                    "posicionamento": "Líder de mercado estabelecido",
-                    "vulnerabilidades": [
-                        "Lentidão na adaptação a mudanças",
-                        "Falta de personalização",
-                        "Processos complexos"
-                    ]
+                    **_CONCORRENTE_PRINCIPAL
                 }
             ],
             "estrategia_palavras_chave": {
                 "palavras_primarias": [
-                    segmento.lower(),
+                    segmento_lower,
                     "estratégia",
                     "marketing",
                     "crescimento",
                     "vendas"
                 ],
-                "palavras_secundarias": [
-                    "digital",
-                    "online",
-                    "automação",
-                    "sistema",
-                    "processo",
-                    "resultado",
-                    "lucro",
-                    "receita",
-                    "cliente",
-                    "negócio"
-                ],
+                "palavras_secundarias": _PALAVRAS_SECUNDARIAS,
                 "palavras_cauda_longa": [
-                    f"como crescer no mercado de {segmento.lower()}",
-                    f"estratégias de marketing para {segmento.lower()}",
-                    f"como aumentar vendas em {segmento.lower()}",
-                    f"automação para {segmento.lower()}",
-                    f"sistema de vendas {segmento.lower()}"
+                    f"como crescer no mercado de {segmento_lower}",
+                    f"estratégias de marketing para {segmento_lower}",
+                    f"como aumentar vendas em {segmento_lower}",
+                    f"automação para {segmento_lower}",
+                    f"sistema de vendas {segmento_lower}"
                 ],
                 "estrategia_conteudo": f"Criar conteúdo educativo sobre {segmento} focando em resultados práticos",
                 "sazonalidade": "Maior busca no início do ano e final do ano",
@@ -785,185 +1244,77 @@ CRÍTICO: Use APENAS dados REAIS da pesquisa fornecida. NUNCA invente ou simule
             },
             "metricas_performance_detalhadas": {
                 "kpis_principais": [
-                    {
-                        "metrica": "Taxa de Conversão",
-                        "objetivo": "3-5%",
-                        "frequencia": "Semanal"
-                    },
+                    _KPI_TAXA_CONVERSAO,
                     {
                         "metrica": "Custo por Lead",
-                        "objetivo": f"R$ {float(preco) * 0.1 if preco else 50}",
+                        "objetivo": custo_por_lead,
                         "frequencia": "Diário"
                     },
                     {
                         "metrica": "Lifetime Value",
-                        "objetivo": f"R$ {float(preco) * 3 if preco else 3000}",
+                        "objetivo": lifetime_value,
                         "frequencia": "Mensal"
                     }
                 ],
                 "projecoes_financeiras": {
                     "cenario_conservador": {
-                        "receita_mensal": f"R$ {float(preco) * 10 if preco else 10000}",
+                        "receita_mensal": receita_conservadora,
                         "clientes_mes": "10-15",
-                        "ticket_medio": f"R$ {preco if preco else 997}",
+                        "ticket_medio": ticket_medio,
                         "margem_lucro": "60%"
                     },
                     "cenario_realista": {
-                        "receita_mensal": f"R$ {float(preco) * 25 if preco else 25000}",
+                        "receita_mensal": receita_realista,
                         "clientes_mes": "25-35",
-                        "ticket_medio": f"R$ {preco if preco else 997}",
+                        "ticket_medio": ticket_medio,
                         "margem_lucro": "70%"
                     },
                     "cenario_otimista": {
-                        "receita_mensal": f"R$ {float(preco) * 50 if preco else 50000}",
+                        "receita_mensal": receita_otimista,
                         "clientes_mes": "50-70",
-                        "ticket_medio": f"R$ {preco if preco else 997}",
+                        "ticket_medio": ticket_medio,
                         "margem_lucro": "80%"
                     }
                 },
                 "roi_esperado": "300-500% em 12 meses",
                 "payback_investimento": "2-4 meses"
             },
-            "plano_acao_detalhado": {
-                "fase_1_preparacao": {
-                    "duracao": "30 dias",
-                    "atividades": [
-                        "Definir posicionamento e mensagem central",
-                        "Criar avatar detalhado do cliente ideal",
-                        "Desenvolver proposta de valor única",
-                        "Estruturar funil de vendas básico"
-                    ],
-                    "investimento": "R$ 5.000 - R$ 15.000",
-                    "entregas": [
-                        "Avatar documentado",
-                        "Posicionamento definido",
-                        "Funil estruturado"
-                    ]
-                },
-                "fase_2_lancamento": {
-                    "duracao": "60 dias",
-                    "atividades": [
-                        "Implementar estratégias de marketing",
-                        "Criar conteúdo para atração",
-                        "Configurar sistemas de automação",
-                        "Testar e otimizar conversões"
-                    ],
-                    "investimento": "R$ 10.000 - R$ 30.000",
-                    "entregas": [
-                        "Campanhas ativas",
-                        "Conteúdo publicado",
-                        "Sistemas funcionando"
-                    ]
-                },
-                "fase_3_crescimento": {
-                    "duracao": "90+ dias",
-                    "atividades": [
-                        "Escalar campanhas que funcionam",
-                        "Expandir para novos canais",
-                        "Otimizar processos internos",
-                        "Desenvolver parcerias estratégicas"
-                    ],
-                    "investimento": "R$ 20.000 - R$ 50.000",
-                    "entregas": [
-                        "Crescimento sustentável",
-                        "Processos otimizados",
-                        "Parcerias ativas"
-                    ]
-                }
-            },
-            "insights_exclusivos": search_insights + [
-                f"O mercado brasileiro de {segmento} está em transformação digital acelerada",
-                "Existe lacuna entre ferramentas disponíveis e conhecimento para implementá-las",
-                "A maior dor não é falta de informação, mas excesso sem direcionamento",
-                f"Profissionais de {segmento} pagam premium por simplicidade",
-                "Fator decisivo é combinação de confiança + urgência + prova social",
-                "Prova social de pares vale mais que depoimentos de clientes diferentes",
-                "Objeção real não é preço, é medo de mais uma tentativa frustrada",
-                f"Sistemas automatizados são vistos como 'santo graal' no {segmento}",
-                "Jornada de compra é longa (3-6 meses) mas decisão final é emocional",
-                "Conteúdo educativo gratuito é porta de entrada, venda acontece na demonstração",
-                f"Mercado de {segmento} saturado de teoria, faminto por implementação prática",
-                "Diferencial competitivo real está na execução e suporte, não apenas na estratégia",
-                "Clientes querem ser guiados passo a passo, não apenas informados",
-                "ROI deve ser demonstrado em semanas, não meses, para gerar confiança",
-                "✅ Análise baseada em dados reais coletados da web - sem simulações"
-            ]
-        }
+            "plano_acao_detalhado": _PLANO_ACAO_DETALHADO,
+            "insights_exclusivos": insights_tail
+        }, default=dict)  # default converte os MappingProxyType compartilhados
     
     def _generate_basic_analysis(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Gera análise básica quando IA não está disponível"""
         
-        return {
-            "avatar_ultra_detalhado": {
-                "perfil_demografico": {
-                    "idade": "25-45 anos",
-                    "renda": "R$ 3.000 - R$ 15.000",
-                    "escolaridade": "Superior",
-                    "localizacao": "Centros urbanos"
-                },
-                "dores_especificas": [
-                    "Falta de conhecimento especializado",
-                    "Dificuldade para implementar estratégias",
-                    "Resultados inconsistentes",
-                    "Falta de direcionamento claro"
-                ],
-                "desejos_profundos": [
-                    "Alcançar liberdade financeira",
-                    "Ter mais tempo para família",
-                    "Ser reconhecido como especialista",
-                    "Fazer diferença no mundo"
-                ]
-            },
-            "escopo": {
-                "posicionamento_mercado": "Solução premium para resultados rápidos",
-                "proposta_valor": "Transforme seu negócio com estratégias comprovadas",
-                "diferenciais_competitivos": ["Metodologia exclusiva", "Suporte personalizado"]
-            },
-            "estrategia_palavras_chave": {
-                "palavras_primarias": [data.get('segmento', 'negócio'), "estratégia", "marketing"],
-                "palavras_secundarias": ["crescimento", "vendas", "digital", "online"],
-                "palavras_cauda_longa": [f"como crescer no {data.get('segmento', 'mercado')}", "estratégias de marketing digital"]
-            },
-            "insights_exclusivos": [
-                f"O mercado de {data.get('segmento', 'negócios')} apresenta oportunidades de crescimento",
-                "A digitalização é uma tendência irreversível no setor",
-                "Investimento em marketing digital é essencial para competitividade",
-                "Personalização da experiência do cliente é um diferencial competitivo",
-                "⚠️ Análise gerada em modo básico - sistemas de IA indisponíveis"
-            ]
-        }
+        return orjson.loads(self._generate_basic_analysis_bytes(data))
+    
+    def _generate_basic_analysis_bytes(self, data: Dict[str, Any]) -> bytes:
+        """Gera a análise básica já serializada em JSON (sem passar por dict)"""
+        
+        segmento = data.get('segmento', _NO_SEGMENTO)
+        if isinstance(segmento, Hashable):
+            return _render_basic_analysis_json(segmento)
+        return _render_basic_analysis_json.__wrapped__(segmento)
     
     def _calculate_quality_score(self, analysis: Dict[str, Any]) -> float:
         """Calcula score de qualidade da análise"""
         
-        score = 0.0
-        max_score = 100.0
-        
-        # Pontuação por seções principais (60 pontos)
-        main_sections = [
-            "avatar_ultra_detalhado", "escopo", "estrategia_palavras_chave", "insights_exclusivos"
-        ]
+        get = analysis.get
         
-        for section in main_sections:
-            if section in analysis and analysis[section]:
-                score += 15.0  # 60/4 = 15 pontos por seção
+        # Pontuação por seções principais (60 pontos: 15 por seção)
+        score = 15.0 * (
+            bool(get("avatar_ultra_detalhado")) + bool(get("escopo"))
+            + bool(get("estrategia_palavras_chave")) + bool(get("insights_exclusivos"))
+        )
         
         # Pontuação por pesquisa (20 pontos)
-        if "pesquisa_web_detalhada" in analysis:
-            score += 10.0
-        if "pesquisa_profunda" in analysis:
-            score += 10.0
+        score += 10.0 * (("pesquisa_web_detalhada" in analysis) + ("pesquisa_profunda" in analysis))
         
         # Pontuação por insights (20 pontos)
-        insights = analysis.get("insights_exclusivos", [])
-        if len(insights) >= 5:
-            score += 20.0
-        elif len(insights) >= 3:
-            score += 15.0
-        elif len(insights) >= 1:
-            score += 10.0
-        
-        return min(score, max_score)
+        total_insights = len(get("insights_exclusivos") or ())
+        score += 20.0 if total_insights >= 5 else 15.0 if total_insights >= 3 else 10.0 if total_insights >= 1 else 0.0
+        
+        return score if score < 100.0 else 100.0
     
     def _generate_fallback_analysis(self, data: Dict[str, Any], error: str) -> Dict[str, Any]:
         """Gera análise de emergência"""
@@ -974,17 +1325,22 @@ CRÍTICO: Use APENAS dados REAIS da pesquisa fornecida. NUNCA invente ou simule
         basic_analysis["insights_exclusivos"].append(f"⚠️ Erro no processamento: {error}")
         basic_analysis["insights_exclusivos"].append("🔄 Recomenda-se executar nova análise")
         
+        # Em rajadas de erro, timestamp e status dos provedores são reaproveitados por 1s
+        ai_status, search_status = _provider_statuses(int(time.time()))
+        
         basic_analysis["metadata"] = {
             "processing_time_seconds": 0,
             "analysis_engine": "Emergency Fallback",
-            "generated_at": datetime.utcnow().isoformat(),
+            "generated_at": _iso_now(),
             "quality_score": 25.0,
-            "recommendation": "Configure pelo menos uma API de IA para análise completa",
+            "recommendations": [
+                "Configure pelo menos uma API de IA para análise completa",
+                "Execute nova análise com configuração completa"
+            ],
             "available_systems": {
-                "ai_providers": ai_manager.get_provider_status(),
-                "search_providers": search_manager.get_provider_status()
-            },
-            "recommendation": "Execute nova análise com configuração completa"
+                "ai_providers": ai_status,
+                "search_providers": search_status
+            }
         }
         
         return basic_analysis
@@ -6,22 +6,76 @@ Cliente para integração com Groq API como fallback do Gemini
 """
 
 import os
+import atexit
+import asyncio
+import time
+import sys
 import logging
-from typing import Optional, Dict, Any
-from groq import Groq
+import importlib.util
+from functools import lru_cache
+from typing import TYPE_CHECKING, Iterator, Optional, Dict, Any, List, Tuple
+from utils.async_utils import LoopScoped
+
+if TYPE_CHECKING:
+    import httpx
+    from groq import AsyncGroq
+
+# groq e httpx (e as dependências deles) só são importados quando GROQ_API_KEY está
+# configurada: sem chave o cliente fica inativo e a importação deste módulo é imediata
 
 logger = logging.getLogger(__name__)
 
+# Mensagem de sistema, igual em todas as requisições (o SDK não modifica as mensagens recebidas)
+_SYSTEM_MESSAGE = {
+    "role": sys.intern("system"),
+    "content": sys.intern("Você é um especialista em análise de mercado ultra-detalhada. Responda sempre em português brasileiro.")
+}
+
+@lru_cache(maxsize=1)
+def _http_options() -> Dict[str, Any]:
+    """Parâmetros de conexão comuns aos clientes HTTP síncrono e assíncrono
+    (HTTP/2 quando o pacote h2 está instalado)"""
+    import httpx
+    return {
+        'http2': importlib.util.find_spec("h2") is not None,
+        'limits': httpx.Limits(max_keepalive_connections=20, max_connections=50),
+        'timeout': httpx.Timeout(60.0, connect=10.0)
+    }
+
+@lru_cache(maxsize=1)
+def _shared_http_client() -> "httpx.Client":
+    """Cliente HTTP único do processo: conexões keep-alive reaproveitadas entre chamadas"""
+    import httpx
+    client = httpx.Client(**_http_options())
+    atexit.register(client.close)
+    return client
+
 class GroqClient:
     """Cliente para integração com Groq API"""
     
+    # Segundos durante os quais o resultado de test_connection é reaproveitado
+    PROBE_TTL = 30
+    
     def __init__(self):
         """Inicializa cliente Groq"""
         self.api_key = os.getenv("GROQ_API_KEY")
         self.model = "llama3-70b-8192"  # Modelo mais capaz
         
+        # Último teste de conexão: (instante em time.monotonic(), resultado)
+        self._last_probe: Optional[Tuple[float, bool]] = None
+        
+        # Erros do SDK: transitórios (timeout/conexão/limite de taxa) valem nova tentativa e
+        # resultam em None; os demais são propagados para que o chamador não repita a requisição
+        self._transient_errors: Tuple[type, ...] = ()
+        self._api_errors: Tuple[type, ...] = ()
+        
         if self.api_key:
-            self.client = Groq(api_key=self.api_key)
+            from groq import APIConnectionError, APIError, Groq, RateLimitError
+            self.client = Groq(api_key=self.api_key, http_client=_shared_http_client())
+            # Cliente assíncrono: um por event loop, compartilhado pelas chamadas desse loop
+            self._aclients = LoopScoped(self._new_async_client, lambda aclient: aclient.close())
+            self._transient_errors = (APIConnectionError, RateLimitError)
+            self._api_errors = (APIError,)
             self.available = True
             logger.info("✅ Groq client inicializado com sucesso")
         else:
@@ -34,31 +88,129 @@ class GroqClient:
         return self.available
     
     def generate_analysis(
+        self, 
+        prompt: str, 
+        max_tokens: int = 8192,
+        temperature: float = 0.7,
+        timeout: int = 60,
+        stream: bool = False
+    ) -> Optional[str]:
+        """Gera análise usando Groq (com stream=True, recebe a resposta em trechos via stream_analysis)
+        
+        Retorna None em falhas transitórias ou resposta vazia (vale nova tentativa);
+        erros terminais da API são propagados.
+        """
+        
+        if not self.available:
+            logger.warning("⚠️ Groq não está disponível")
+            return None
+        
+        try:
+            if stream:
+                content = "".join(self.stream_analysis(prompt, max_tokens, temperature, timeout))
+            else:
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=[_SYSTEM_MESSAGE, {"role": "user", "content": prompt}],
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    timeout=timeout
+                )
+                content = response.choices[0].message.content
+            
+            if content:
+                logger.info("✅ Groq gerou %d caracteres", len(content))
+                return content
+            else:
+                logger.error("❌ Groq retornou resposta vazia")
+                return None
+                
+        except self._transient_errors as e:
+            logger.warning("⚠️ Erro transitório na requisição Groq (nova tentativa possível): %s", e)
+            return None
+        except self._api_errors as e:
+            logger.error("❌ Erro da API Groq: %s", e)
+            raise
+        except Exception as e:
+            logger.error("❌ Erro na requisição Groq: %s", e)
+            raise
+    
+    def stream_analysis(
+        self, 
+        prompt: str, 
+        max_tokens: int = 8192,
+        temperature: float = 0.7,
+        timeout: int = 60
+    ) -> Iterator[str]:
+        """Gera análise usando Groq em streaming, entregando cada trecho assim que chega"""
+        
+        if not self.available:
+            logger.warning("⚠️ Groq não está disponível")
+            return
+        
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[_SYSTEM_MESSAGE, {"role": "user", "content": prompt}],
+            max_tokens=max_tokens,
+            temperature=temperature,
+            timeout=timeout,
+            stream=True
+        )
+        for chunk in response:
+            yield chunk.choices[0].delta.content or ""
+    
+    async def agenerate_analysis(
         self, 
         prompt: str, 
         max_tokens: int = 8192,
         temperature: float = 0.7,
         timeout: int = 60
     ) -> Optional[str]:
-        """Gera análise usando Groq"""
+        """Versão assíncrona de generate_analysis
+        
+        Para vários prompts, execute-os em paralelo (todos usam o cliente do loop atual):
+        await asyncio.gather(*(groq_client.agenerate_analysis(p) for p in prompts))
+        """
         
         if not self.available:
             logger.warning("⚠️ Groq não está disponível")
             return None
         
+        aclient = await self._aclients.get()
+        return await self._agenerate_with(aclient, prompt, max_tokens, temperature, timeout)
+    
+    async def agenerate_batch(self, prompts: List[str], **kwargs: Any) -> List[Optional[str]]:
+        """Gera análises para vários prompts em paralelo, com o cliente assíncrono do loop atual"""
+        
+        if not self.available:
+            logger.warning("⚠️ Groq não está disponível")
+            return [None] * len(prompts)
+        
+        aclient = await self._aclients.get()
+        return list(await asyncio.gather(
+            *(self._agenerate_with(aclient, prompt, **kwargs) for prompt in prompts)
+        ))
+    
+    def _new_async_client(self) -> "AsyncGroq":
+        """Novo cliente AsyncGroq para o event loop atual"""
+        import httpx
+        from groq import AsyncGroq
+        return AsyncGroq(api_key=self.api_key, http_client=httpx.AsyncClient(**_http_options()))
+    
+    async def _agenerate_with(
+        self,
+        aclient: "AsyncGroq",
+        prompt: str,
+        max_tokens: int = 8192,
+        temperature: float = 0.7,
+        timeout: int = 60
+    ) -> Optional[str]:
+        """Executa uma requisição assíncrona com o cliente informado (erros tratados como em generate_analysis)"""
+        
         try:
-            response = self.client.chat.completions.create(
+            response = await aclient.chat.completions.create(
                 model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "Você é um especialista em análise de mercado ultra-detalhada. Responda sempre em português brasileiro."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
+                messages=[_SYSTEM_MESSAGE, {"role": "user", "content": prompt}],
                 max_tokens=max_tokens,
                 temperature=temperature,
                 timeout=timeout
@@ -66,32 +218,48 @@ class GroqClient:
             
             content = response.choices[0].message.content
             if content:
-                logger.info(f"✅ Groq gerou {len(content)} caracteres")
+                logger.info("✅ Groq gerou %d caracteres", len(content))
                 return content
             else:
                 logger.error("❌ Groq retornou resposta vazia")
                 return None
                 
-        except Exception as e:
-            logger.error(f"❌ Erro na requisição Groq: {str(e)}")
+        except self._transient_errors as e:
+            logger.warning("⚠️ Erro transitório na requisição Groq (nova tentativa possível): %s", e)
             return None
+        except self._api_errors as e:
+            logger.error("❌ Erro da API Groq: %s", e)
+            raise
+        except Exception as e:
+            logger.error("❌ Erro na requisição Groq: %s", e)
+            raise
     
     def test_connection(self) -> bool:
-        """Testa conexão com Groq"""
+        """Testa conexão com Groq (resultado reaproveitado por PROBE_TTL segundos)"""
         
         if not self.available:
             return False
         
+        now = time.monotonic()
+        if self._last_probe and now - self._last_probe[0] < self.PROBE_TTL:
+            return self._last_probe[1]
+        
         try:
             test_result = self.generate_analysis(
                 "Responda apenas: GROQ_OK", 
                 max_tokens=10, 
-                timeout=30
+                timeout=10
             )
-            return test_result is not None and "GROQ_OK" in test_result
+            ok = test_result is not None and "GROQ_OK" in test_result
         except Exception as e:
-            logger.error(f"❌ Erro no teste de conexão Groq: {str(e)}")
-            return False
+            logger.error("❌ Erro no teste de conexão Groq: %s", e)
+            ok = False
+        
+        self._last_probe = (time.monotonic(), ok)
+        return ok
 
-# Instância global
-groq_client = GroqClient()
\ No newline at end of file
+# Instância global, criada no primeiro acesso
+@lru_cache(maxsize=1)
+def get_groq_client() -> GroqClient:
+    """Retorna o cliente Groq do processo, criando-o na primeira chamada"""
+    return GroqClient()
@@ -21,11 +21,15 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 from services.ai_manager import ai_manager
 from services.production_search_manager import production_search_manager
 from services.production_content_extractor import production_content_extractor
-from services.groq_client import groq_client
+from services.groq_client import get_groq_client
 from database import db_manager
 
 logger = logging.getLogger(__name__)
 
+# Tentativas do fallback Groq em falhas transitórias e espera base entre elas (segundos)
+GROQ_ATTEMPTS = 3
+GROQ_RETRY_BACKOFF = 2
+
 @celery_app.task(bind=True)
 def process_market_analysis(self, analysis_data: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -225,8 +229,17 @@ def perform_ai_analysis_with_fallback(analysis_data: Dict[str, Any], search_resu
         try:
             logger.info("🔄 Tentando fallback com Groq...")
             
+            groq_client = get_groq_client()
             if groq_client.is_available():
-                groq_response = groq_client.generate_analysis(prompt, max_tokens=8192)
+                # None indica falha transitória e vale nova tentativa; erros terminais da API
+                # são propagados e seguem direto para a análise básica
+                groq_response = None
+                for attempt in range(GROQ_ATTEMPTS):
+                    if attempt:
+                        time.sleep(GROQ_RETRY_BACKOFF * attempt)
+                    groq_response = groq_client.generate_analysis(prompt, max_tokens=8192)
+                    if groq_response is not None:
+                        break
                 
                 if groq_response and len(groq_response) > 500:
                     logger.info("✅ Análise concluída com Groq")
@@ -441,6 +454,7 @@ def validate_apis() -> Dict[str, Any]:
     
     # Valida Groq
     try:
+        groq_client = get_groq_client()
         if groq_client.is_available():
             test_result = groq_client.test_connection()
             results['apis']['groq'] = {
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ARQV30 Enhanced v2.0 - Async Utilities
+Utilitários para clientes assíncronos presos ao event loop em que foram criados
+"""
+
+import asyncio
+import logging
+from typing import Any, AsyncGenerator, Awaitable, Callable, Dict, Generic, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+class LoopScoped(Generic[T]):
+    """Um recurso por event loop (conexões assíncronas não atravessam loops), reaproveitado
+    pelas chamadas do mesmo loop e fechado quando o loop é encerrado"""
+
+    def __init__(self, factory: Callable[[], T], aclose: Callable[[T], Awaitable[Any]]):
+        self._factory = factory
+        self._aclose = aclose
+        # loop -> (recurso, gerador de encerramento). O recurso costuma guardar referência ao
+        # próprio loop, então a entrada é removida explicitamente e não por weakref
+        self._entries: Dict[asyncio.AbstractEventLoop, Tuple[T, AsyncGenerator[None, None]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self) -> T:
+        """Recurso do event loop atual, criado na primeira chamada feita nele"""
+        loop = asyncio.get_running_loop()
+        entry = self._entries.get(loop)
+        if entry is not None:
+            return entry[0]
+
+        self._discard_closed_loops()
+        resource = self._factory()
+        closer = self._close_on_shutdown(loop, resource)
+        self._entries[loop] = (resource, closer)
+        # A primeira iteração registra o gerador no loop, que o finaliza em shutdown_asyncgens
+        await closer.__anext__()
+        return resource
+
+    async def _close_on_shutdown(self, loop: asyncio.AbstractEventLoop, resource: T) -> AsyncGenerator[None, None]:
+        """Fecha o recurso quando o loop finaliza seus geradores assíncronos (asyncio.run faz
+        isso antes de fechar o loop, que ainda está ativo para o await)"""
+        try:
+            yield
+        finally:
+            self._entries.pop(loop, None)
+            try:
+                await self._aclose(resource)
+            except Exception as e:
+                logger.warning("⚠️ Falha ao fechar cliente assíncrono: %s", e)
+
+    def _discard_closed_loops(self) -> None:
+        """Descarta recursos de loops fechados sem shutdown_asyncgens (não há mais como
+        aguardar o fechamento; as conexões são liberadas junto com os objetos)"""
+        for loop in [loop for loop in list(self._entries) if loop.is_closed()]:
+            self._entries.pop(loop, None)
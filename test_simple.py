@@ -152,6 +152,37 @@ def test_file_processing():
         print(f"❌ Erro no processamento de arquivos: {str(e)}")
         return False
 
+def test_async_client_release():
+    """Testa se o cliente assíncrono de um loop é fechado e descartado ao fim do asyncio.run"""
+    print("\n🔍 Testando liberação de clientes assíncronos...")
+    
+    try:
+        import asyncio
+        from utils.async_utils import LoopScoped
+        
+        closed = []
+        
+        async def close(resource):
+            closed.append(resource)
+        
+        clients = LoopScoped(object, close)
+        
+        async def use_twice():
+            return await clients.get() is await clients.get()
+        
+        shared = asyncio.run(use_twice())
+        
+        if shared and len(closed) == 1 and len(clients) == 0:
+            print("✅ Cliente reaproveitado no loop e liberado ao encerrá-lo!")
+            return True
+        else:
+            print(f"❌ Cliente não liberado: compartilhado={shared}, fechados={len(closed)}, restantes={len(clients)}")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Erro na liberação de clientes assíncronos: {str(e)}")
+        return False
+
 def run_all_tests():
     """Executa todos os testes"""
     print("=" * 50)
@@ -163,7 +194,8 @@ def run_all_tests():
         ("Conexão Gemini", test_gemini_connection),
         ("Banco de Dados", test_database_connection),
         ("Serviço de Análise", test_analysis_service),
-        ("Processamento de Arquivos", test_file_processing)
+        ("Processamento de Arquivos", test_file_processing),
+        ("Clientes Assíncronos", test_async_client_release)
     ]
     
     results = []